@@ -5,11 +5,7 @@ Agno Skills Agent - 使用 Agno 框架动态加载和执行 Agent Skills 的系
 遵循 Agent Skills 规范。
 """
 
-from .skills_agent import SkillsAgent
-from .skill_loader import SkillLoader, SkillMetadata
-from .skill_executor import SkillExecutor
-from .skill_matcher import SkillMatcher
-from .skill_creator_tools import SkillCreatorTools, create_skill_creator_tools
+import importlib
 
 __version__ = "0.1.0"
 __all__ = [
@@ -21,3 +17,28 @@ __all__ = [
     "SkillCreatorTools",
     "create_skill_creator_tools",
 ]
+
+# 公开名称 -> 所在子模块，首次访问时才导入（PEP 562），
+# 只使用其中一个类时不必加载 agno 等全部依赖
+_lazy = {
+    "SkillsAgent": ".skills_agent",
+    "SkillLoader": ".skill_loader",
+    "SkillMetadata": ".skill_loader",
+    "SkillExecutor": ".skill_executor",
+    "SkillMatcher": ".skill_matcher",
+    "SkillCreatorTools": ".skill_creator_tools",
+    "create_skill_creator_tools": ".skill_creator_tools",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy:
+        module = importlib.import_module(_lazy[name], __package__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
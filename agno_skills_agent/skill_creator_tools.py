@@ -4,22 +4,29 @@ Skill Creator Tools - 创建和管理 skills 的辅助函数。
 提供与 skills-examples 中 skill-creator 脚本的集成。
 """
 
+import os
 import sys
+import json
+import asyncio
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from .skill_executor import _run_script_in_process, _run_subprocess
 
 
 class SkillCreatorTools:
     """创建和管理 skills 的工具。"""
     
-    def __init__(self, skills_examples_dir: Optional[Path] = None):
+    def __init__(self, skills_examples_dir: Optional[Path] = None, help_cache_path: Optional[Path] = None):
         """
         初始化 skill 创建工具。
         
         参数:
             skills_examples_dir: skills-examples 目录路径
                                 如果为 None，尝试相对于当前位置查找
+            help_cache_path: --help 输出的磁盘缓存文件（例如 ~/.cache/agno_skills/help.json），
+                                进程重启后仍可直接使用；默认为 None，只缓存在内存中
         """
         if skills_examples_dir:
             self.skills_examples_dir = Path(skills_examples_dir)
@@ -34,6 +41,117 @@ class SkillCreatorTools:
         # 检查 skill-creator 是否存在
         if not self.skill_creator_dir.exists():
             print(f"Warning: skill-creator not found at {self.skill_creator_dir}")
+        
+        # 脚本是否存在只在初始化时检查一次，调用时不再 stat
+        self._scripts: Dict[str, Path] = {
+            name: path
+            for name in ("init_skill", "package_skill", "quick_validate")
+            if (path := self.scripts_dir / f"{name}.py").exists()
+        }
+        if self.skill_creator_dir.exists() and len(self._scripts) < 3:
+            missing = {"init_skill", "package_skill", "quick_validate"} - self._scripts.keys()
+            print(f"Warning: skill-creator scripts missing: {', '.join(sorted(missing))}")
+        
+        # --help 输出对同一版本的脚本不变：脚本绝对路径 -> (mtime, 大小, 帮助文本)，
+        # 每个脚本只保留最新版本的一条
+        self._help_cache_path = help_cache_path
+        self._help_cache: Dict[str, Tuple[int, int, str]] = self._load_help_cache()
+    
+    def _load_help_cache(self) -> Dict[str, Tuple[int, int, str]]:
+        """
+        从磁盘加载 --help 输出缓存，未启用、文件不存在或损坏时返回空字典。
+        
+        已不存在的脚本的条目在加载时丢弃，下次写入时随之从文件中移除；
+        任一条目的结构或字段类型不符（例如旧版本写入的格式）时整个文件视为无效。
+        """
+        if self._help_cache_path is None:
+            return {}
+        try:
+            with open(self._help_cache_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            cache = {}
+            for path, mtime, size, text in entries:
+                if not (
+                    isinstance(path, str)
+                    and type(mtime) is int
+                    and type(size) is int
+                    and isinstance(text, str)
+                ):
+                    return {}
+                if os.path.exists(path):
+                    cache[path] = (mtime, size, text)
+            return cache
+        except (OSError, ValueError, TypeError):
+            return {}
+    
+    def _save_help_cache(self):
+        """将 --help 输出缓存原子地写入磁盘，未启用或写入失败时忽略。"""
+        if self._help_cache_path is None:
+            return
+        try:
+            self._help_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._help_cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    [[path, *entry] for path, entry in self._help_cache.items()],
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_path, self._help_cache_path)
+        except OSError:
+            pass
+    
+    def _run_script(
+        self,
+        script_path: Path,
+        args: List[str],
+        timeout: int,
+        in_process: bool = False
+    ) -> Tuple[int, str, str]:
+        """
+        使用给定参数运行 skill-creator 脚本。
+        
+        in_process 为 True 时与可信 skill 脚本一样在当前进程中以 __main__ 方式
+        运行（返回码、输出捕获与命令行一致），省去启动解释器的开销；否则以
+        子进程执行。进程内运行无法强制超时，只用于工作量有界的调用
+        （--help、生成模板、校验单个 SKILL.md）。
+        
+        参数:
+            script_path: 脚本路径
+            args: 传递给脚本的参数
+            timeout: 超时时间（秒），仅用于子进程
+            in_process: 是否在当前进程中运行
+            
+        返回:
+            (返回码, stdout, stderr) 元组
+        """
+        argv = [str(script_path), *args]
+        
+        if in_process:
+            return _run_script_in_process(argv[0], args)
+        
+        return _run_subprocess([sys.executable, *argv], timeout=timeout)
+    
+    def _get_help(self, script_path: Path) -> str:
+        """
+        获取脚本的 --help 输出，结果按脚本的绝对路径缓存，mtime 或大小变化时重新获取。
+        
+        参数:
+            script_path: 脚本路径
+            
+        返回:
+            帮助文本
+        """
+        key = str(script_path.resolve())
+        st = script_path.stat()
+        cached = self._help_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        _, stdout, _ = self._run_script(script_path, ["--help"], timeout=10, in_process=True)
+        self._help_cache[key] = (st.st_mtime_ns, st.st_size, stdout)
+        self._save_help_cache()
+        return stdout
     
     def init_skill(self, skill_name: str, output_path: Optional[str] = None) -> str:
         """
@@ -48,28 +166,23 @@ class SkillCreatorTools:
         返回:
             init_skill.py 脚本的输出
         """
-        init_script = self.scripts_dir / "init_skill.py"
+        init_script = self._scripts.get("init_skill")
         
-        if not init_script.exists():
-            return f"Error: init_skill.py not found at {init_script}"
+        if not init_script:
+            return f"Error: init_skill.py not found in {self.scripts_dir}"
         
-        cmd = [sys.executable, str(init_script), skill_name]
+        args = [skill_name]
         
         if output_path:
-            cmd.extend(["--path", output_path])
+            args.extend(["--path", output_path])
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            returncode, stdout, stderr = self._run_script(init_script, args, timeout=60, in_process=True)
             
-            if result.returncode != 0:
-                return f"Error creating skill:\n{result.stderr}"
+            if returncode != 0:
+                return f"Error creating skill:\n{stderr}"
             
-            return result.stdout
+            return stdout
             
         except subprocess.TimeoutExpired:
             return "Error: Skill creation timed out"
@@ -89,28 +202,24 @@ class SkillCreatorTools:
         返回:
             package_skill.py 脚本的输出
         """
-        package_script = self.scripts_dir / "package_skill.py"
+        package_script = self._scripts.get("package_skill")
         
-        if not package_script.exists():
-            return f"Error: package_skill.py not found at {package_script}"
+        if not package_script:
+            return f"Error: package_skill.py not found in {self.scripts_dir}"
         
-        cmd = [sys.executable, str(package_script), skill_path]
+        args = [skill_path]
         
         if output_dir:
-            cmd.append(output_dir)
+            args.append(output_dir)
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            # 打包会遍历整个 skill 目录，耗时不定，需要子进程的超时保护
+            returncode, stdout, stderr = self._run_script(package_script, args, timeout=60)
             
-            if result.returncode != 0:
-                return f"Error packaging skill:\n{result.stderr}"
+            if returncode != 0:
+                return f"Error packaging skill:\n{stderr}"
             
-            return result.stdout
+            return stdout
             
         except subprocess.TimeoutExpired:
             return "Error: Skill packaging timed out"
@@ -129,25 +238,18 @@ class SkillCreatorTools:
         返回:
             验证结果
         """
-        validate_script = self.scripts_dir / "quick_validate.py"
-        
-        if not validate_script.exists():
-            return f"Error: quick_validate.py not found at {validate_script}"
+        validate_script = self._scripts.get("quick_validate")
         
-        cmd = [sys.executable, str(validate_script), skill_path]
+        if not validate_script:
+            return f"Error: quick_validate.py not found in {self.scripts_dir}"
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            returncode, stdout, stderr = self._run_script(validate_script, [skill_path], timeout=30, in_process=True)
             
-            if result.returncode != 0:
-                return f"Validation failed:\n{result.stderr}"
+            if returncode != 0:
+                return f"Validation failed:\n{stderr}"
             
-            return result.stdout
+            return stdout
             
         except subprocess.TimeoutExpired:
             return "Error: Validation timed out"
@@ -156,39 +258,121 @@ class SkillCreatorTools:
     
     def get_init_help(self) -> str:
         """获取 init_skill.py 的帮助文本。"""
-        init_script = self.scripts_dir / "init_skill.py"
+        init_script = self._scripts.get("init_skill")
         
-        if not init_script.exists():
+        if not init_script:
             return "init_skill.py not found"
         
         try:
-            result = subprocess.run(
-                [sys.executable, str(init_script), "--help"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.stdout
+            return self._get_help(init_script)
         except Exception as e:
             return f"Error: {str(e)}"
     
     def get_package_help(self) -> str:
         """获取 package_skill.py 的帮助文本。"""
-        package_script = self.scripts_dir / "package_skill.py"
+        package_script = self._scripts.get("package_skill")
         
-        if not package_script.exists():
+        if not package_script:
             return "package_skill.py not found"
         
         try:
-            result = subprocess.run(
-                [sys.executable, str(package_script), "--help"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.stdout
+            return self._get_help(package_script)
         except Exception as e:
             return f"Error: {str(e)}"
+    
+    async def _run_batch(self, cmds: List[Tuple[str, List[str]]], timeout: int) -> List[str]:
+        """
+        并发运行多个 skill-creator 脚本。
+        
+        参数:
+            cmds: (脚本文件名, 参数列表) 元组的列表
+            timeout: 每个脚本的超时时间（秒）
+            
+        返回:
+            与 cmds 顺序对应的输出列表
+        """
+        async def run_one(script_name: str, args: List[str]) -> str:
+            script = self._scripts.get(Path(script_name).stem)
+            if not script:
+                return f"Error: {script_name} not found in {self.scripts_dir}"
+            
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    sys.executable, str(script), *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                return f"Error: {str(e)}"
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return f"Error: {script_name} timed out"
+            
+            if proc.returncode != 0:
+                return f"Error running {script_name}:\n{stderr.decode('utf-8', errors='replace')}"
+            return stdout.decode("utf-8", errors="replace")
+        
+        return await asyncio.gather(*[run_one(name, args) for name, args in cmds])
+    
+    async def run_many_async(self, cmds: List[Tuple[str, List[str]]], timeout: int = 60) -> List[str]:
+        """
+        run_many 的异步版本，供已在事件循环中的调用方直接 await。
+        
+        参数:
+            cmds: (脚本文件名, 参数列表) 元组的列表
+            timeout: 每个脚本的超时时间（秒）
+            
+        返回:
+            与 cmds 顺序对应的输出列表
+        """
+        return await self._run_batch(cmds, timeout)
+    
+    def run_many(self, cmds: List[Tuple[str, List[str]]], timeout: int = 60) -> List[str]:
+        """
+        并发运行多个相互独立的 skill-creator 脚本。
+        
+        总耗时约为最慢的一个脚本，而不是所有脚本之和。
+        脚本只从 skill-creator 的 scripts 目录中已发现的脚本里查找。
+        在已运行的事件循环中调用时，批次在单独线程的事件循环中并发运行，
+        调用会等待其完成；能 await 的调用方应改用 run_many_async，避免阻塞当前循环。
+        
+        参数:
+            cmds: (脚本文件名, 参数列表) 元组的列表，
+                  例如 [("quick_validate.py", ["skills/a"]), ...]
+            timeout: 每个脚本的超时时间（秒）
+            
+        返回:
+            与 cmds 顺序对应的输出列表
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._run_batch(cmds, timeout))
+        
+        # 当前线程已有事件循环，不能再 asyncio.run；在新线程的独立循环中并发运行
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self._run_batch(cmds, timeout)).result()
+    
+    def validate_skills(self, skill_paths: List[str]) -> str:
+        """
+        并发验证多个 skills。
+        
+        参数:
+            skill_paths: skill 目录路径列表
+            
+        返回:
+            每个 skill 的验证结果
+        """
+        results = self.run_many(
+            [("quick_validate.py", [path]) for path in skill_paths],
+            timeout=30
+        )
+        return "\n".join(
+            f"## {path}\n{result}" for path, result in zip(skill_paths, results)
+        )
 
 
 def create_skill_creator_tools(skills_agent) -> list:
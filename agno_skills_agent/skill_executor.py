@@ -4,20 +4,1019 @@ Skill Executor - 将 skill 资源转换为可执行的 Agno 工具。
 处理从 skills 动态加载脚本、references 和 assets。
 """
 
+import io
+import os
+import re
 import sys
-import importlib.util
+import ast
+import keyword
+import runpy
+import time
+import mmap
+import fnmatch
+import selectors
+import signal
+import threading
+import multiprocessing
+import tempfile
+import traceback
+import functools
+import contextlib
 import subprocess
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Callable, List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 from .skill_loader import SkillContent
 
 
+# 执行 skill 脚本的常驻进程池，首次使用时创建
+_EXECUTOR: Optional["_ScriptPool"] = None
+
+# 进程池的工作进程是否已全部启动
+_EXECUTOR_WARM = False
+
+# 可信模式下在主进程内运行脚本时，串行化对 sys.argv/stdout 的替换
+_IN_PROCESS_LOCK = threading.Lock()
+
+# 参考文件文本缓存：路径 -> (mtime, 大小, 文本)，按最近使用顺序排列，
+# 总字节数不超过 _TEXT_CACHE_MAX_BYTES
+_TEXT_CACHE: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_TEXT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_TEXT_CACHE_BYTES = 0
+_TEXT_CACHE_LOCK = threading.Lock()
+
+
+def _record_worker_pid(pid_queue: Any):
+    """工作进程的初始化函数：把自身 PID 报告给主进程。"""
+    pid_queue.put(os.getpid())
+
+
+class _ScriptPool(ProcessPoolExecutor):
+    """
+    记录工作进程 PID 的脚本进程池。
+    
+    工作进程以 spawn 方式启动：agent 进程中已有线程池在运行，fork 出的子进程
+    可能继承被其他线程持有的锁。PID 由各工作进程在初始化时报告，超时时据此
+    终止工作进程，无需访问 ProcessPoolExecutor 的内部属性。
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        context = multiprocessing.get_context("spawn")
+        self._pid_queue = context.SimpleQueue()
+        self._worker_pids: Set[int] = set()
+        super().__init__(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_record_worker_pid,
+            initargs=(self._pid_queue,)
+        )
+    
+    def worker_pids(self) -> Set[int]:
+        """返回已启动的工作进程的 PID。"""
+        while not self._pid_queue.empty():
+            self._worker_pids.add(self._pid_queue.get())
+        return set(self._worker_pids)
+
+
+def _get_executor() -> _ScriptPool:
+    """获取共享的脚本执行进程池。"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = _ScriptPool(max_workers=os.cpu_count())
+    return _EXECUTOR
+
+
+def _reset_executor(executor: _ScriptPool, terminate: bool = False):
+    """
+    丢弃进程池（超时或工作进程崩溃后），下次使用时重建。
+    
+    shutdown 和 future.cancel() 都不会停止已开始运行的任务，脚本超时后需要
+    强制结束工作进程（与 subprocess.run 超时时 kill 子进程一致），否则挂起的
+    脚本会一直占用其进程；同一进程池中其他正在运行的调用会因此收到
+    BrokenProcessPool。已结束的工作进程由进程池的管理线程回收。
+    
+    参数:
+        executor: 要丢弃的进程池；已被其他调用替换时不影响新的进程池
+        terminate: 是否强制结束仍在运行的工作进程
+    """
+    global _EXECUTOR, _EXECUTOR_WARM
+    if _EXECUTOR is executor:
+        _EXECUTOR = None
+        _EXECUTOR_WARM = False
+    
+    if terminate:
+        # 进程池关闭前工作进程不会退出，记录的 PID 仍属于这些进程
+        for pid in executor.worker_pids():
+            with contextlib.suppress(OSError):
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _warm_executor():
+    """
+    预先启动进程池的全部工作进程。
+    
+    ProcessPoolExecutor 按需创建工作进程，首批调用仍需等待解释器启动；
+    提交与工作进程数相同的空任务并等待完成，使这部分开销发生在服务请求之前。
+    """
+    global _EXECUTOR_WARM
+    if _EXECUTOR_WARM:
+        return
+    
+    executor = _get_executor()
+    futures = [executor.submit(os.getpid) for _ in range(os.cpu_count() or 1)]
+    for future in futures:
+        future.result()
+    _EXECUTOR_WARM = True
+
+
+def _read_file_bytes(path: Any) -> bytes:
+    """
+    通过内存映射读取文件的原始字节。
+    
+    内容由页缓存直接映射，只在切片时复制一次，不经过文本层解码。
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 空文件无法映射
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+
+def _read_text_bytes(path: Any) -> bytes:
+    """
+    读取 UTF-8 文本文件，返回校验过编码、换行已统一的字节。
+    
+    与文本模式 open 的行为一致：按 UTF-8 严格解码，CRLF 和单独的 CR 统一为 LF。
+    
+    参数:
+        path: 文件路径
+        
+    返回:
+        UTF-8 编码的文件内容
+        
+    异常:
+        UnicodeDecodeError: 文件不是有效的 UTF-8
+    """
+    raw = _read_file_bytes(path)
+    raw.decode("utf-8")
+    if b"\r" in raw:
+        raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return raw
+
+
+def _read_files(paths: List[Path]) -> Dict[Path, Any]:
+    """
+    批量读取多个 UTF-8 文本文件，内容为 _read_text_bytes 的结果。
+    
+    文件较多时在线程池中并发读取，使各文件的 I/O 等待相互重叠；
+    文件很少时直接顺序读取，省去线程池的开销。
+    
+    参数:
+        paths: 文件路径列表
+        
+    返回:
+        路径到字节内容的字典；读取或解码失败的文件对应其异常对象
+    """
+    def read_one(path: Path) -> Any:
+        try:
+            return _read_text_bytes(path)
+        except (OSError, UnicodeDecodeError) as e:
+            return e
+    
+    if len(paths) < 3:
+        return {path: read_one(path) for path in paths}
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        return dict(zip(paths, pool.map(read_one, paths)))
+
+
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """
+    读取文本文件，按路径缓存。
+    
+    每个路径只保留一个条目，(mtime, 大小) 与调用方 stat 的结果不一致时重新读取并替换；
+    缓存按文件字节数计量，超过 _TEXT_CACHE_MAX_BYTES 时淘汰最久未使用的条目。
+    
+    参数:
+        path: 文件路径
+        mtime_ns: 文件的 st_mtime_ns
+        size: 文件的 st_size
+        
+    返回:
+        文件文本
+    """
+    global _TEXT_CACHE_BYTES
+    with _TEXT_CACHE_LOCK:
+        entry = _TEXT_CACHE.get(path)
+        if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+            _TEXT_CACHE.move_to_end(path)
+            return entry[2]
+    
+    text = _read_text_bytes(path).decode("utf-8")
+    
+    with _TEXT_CACHE_LOCK:
+        old = _TEXT_CACHE.pop(path, None)
+        if old is not None:
+            _TEXT_CACHE_BYTES -= old[1]
+        # 超过上限的单个文件不缓存，避免清空其他条目
+        if size <= _TEXT_CACHE_MAX_BYTES:
+            _TEXT_CACHE[path] = (mtime_ns, size, text)
+            _TEXT_CACHE_BYTES += size
+            while _TEXT_CACHE_BYTES > _TEXT_CACHE_MAX_BYTES:
+                _, (_, evicted_size, _) = _TEXT_CACHE.popitem(last=False)
+                _TEXT_CACHE_BYTES -= evicted_size
+    return text
+
+
+@functools.lru_cache(maxsize=128)
+def _scandir_cached(directory: str, mtime_ns: int) -> Tuple[Tuple[str, bool], ...]:
+    """
+    列出目录的直接子项，按 (目录, mtime) 缓存。
+    
+    目录中增删条目会改变其 mtime，从而使缓存失效。
+    
+    返回:
+        (名称, 是否为目录) 元组
+    """
+    with os.scandir(directory) as it:
+        return tuple((entry.name, entry.is_dir()) for entry in it)
+
+
+def _drain_pipes(fds: List[int], deadline: float, cmd: List[str], timeout: float) -> Dict[int, bytes]:
+    """
+    用 selectors 同时读取多个管道直到全部到达 EOF。
+    
+    每次 os.read 最多 64 KiB，读完后一次性拼接，不经过文本层。
+    
+    参数:
+        fds: 管道读端文件描述符
+        deadline: 截止时间（time.monotonic() 时间）
+        cmd: 命令（用于超时异常）
+        timeout: 超时时间（用于超时异常）
+        
+    返回:
+        文件描述符到全部输出字节的字典
+        
+    异常:
+        subprocess.TimeoutExpired: 截止时间前未读完
+    """
+    chunks: Dict[int, List[bytes]] = {fd: [] for fd in fds}
+    
+    with selectors.DefaultSelector() as sel:
+        for fd in fds:
+            sel.register(fd, selectors.EVENT_READ)
+        
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            for key, _ in sel.select(remaining):
+                buf = os.read(key.fd, 65536)
+                if buf:
+                    chunks[key.fd].append(buf)
+                else:
+                    sel.unregister(key.fd)
+    
+    return {fd: b"".join(parts) for fd, parts in chunks.items()}
+
+
+def _spawn_and_capture(cmd: List[str], timeout: float) -> Tuple[int, str, str]:
+    """
+    通过 os.posix_spawn 启动子进程并捕获输出。
+    
+    posix_spawn 不复制父进程的页表（agent 进程常驻内存较大时 fork 代价很高），
+    stdout/stderr 通过 POSIX_SPAWN_DUP2 接到 os.pipe 的写端。
+    
+    参数:
+        cmd: 命令及参数，cmd[0] 必须是可执行文件的完整路径
+        timeout: 超时时间（秒）
+        
+    返回:
+        (返回码, stdout, stderr) 元组
+        
+    异常:
+        subprocess.TimeoutExpired: 超时（子进程已被终止）
+    """
+    deadline = time.monotonic() + timeout
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    
+    try:
+        pid = os.posix_spawn(
+            cmd[0],
+            cmd,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_DUP2, out_w, 1),
+                (os.POSIX_SPAWN_DUP2, err_w, 2),
+            ]
+        )
+    except BaseException:
+        for fd in (out_r, out_w, err_r, err_w):
+            os.close(fd)
+        raise
+    
+    # 子进程持有写端的副本，父进程关闭后读端才能在子进程退出时收到 EOF
+    os.close(out_w)
+    os.close(err_w)
+    
+    try:
+        output = _drain_pipes([out_r, err_r], deadline, cmd, timeout)
+        
+        while True:
+            waited_pid, status = os.waitpid(pid, os.WNOHANG)
+            if waited_pid:
+                break
+            if time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            time.sleep(0.005)
+    except subprocess.TimeoutExpired:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        raise
+    finally:
+        os.close(out_r)
+        os.close(err_r)
+    
+    return (
+        os.waitstatus_to_exitcode(status),
+        output[out_r].decode("utf-8", errors="replace"),
+        output[err_r].decode("utf-8", errors="replace")
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_glob(pattern: str) -> Callable[[str], Any]:
+    """
+    将 glob 模式编译为正则匹配函数并缓存。
+    
+    重复的模式直接复用已编译的正则，匹配时也无需 fnmatch.filter 对每个名称做 normcase。
+    """
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def _run_subprocess(cmd: List[str], timeout: float, cwd: Optional[str] = None) -> Tuple[int, str, str]:
+    """
+    以子进程运行命令，按块读取输出。
+    
+    不需要切换工作目录且平台支持时使用 os.posix_spawn；否则使用 Popen
+    （os.posix_spawn 不支持设置工作目录，Windows 上也不可用）。两种方式都以
+    64 KiB 为单位读取原始字节，全部读完后才一次性解码。
+    
+    参数:
+        cmd: 命令及参数
+        timeout: 超时时间（秒）
+        cwd: 工作目录（可选）
+        
+    返回:
+        (返回码, stdout, stderr) 元组
+        
+    异常:
+        subprocess.TimeoutExpired: 超时（子进程已被终止）
+    """
+    if cwd is None and hasattr(os, "posix_spawn") and os.path.isabs(cmd[0]):
+        return _spawn_and_capture(cmd, timeout)
+    
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+    out_fd, err_fd = proc.stdout.fileno(), proc.stderr.fileno()
+    
+    try:
+        output = _drain_pipes([out_fd, err_fd], deadline, cmd, timeout)
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+    
+    return (
+        returncode,
+        output[out_fd].decode("utf-8", errors="replace"),
+        output[err_fd].decode("utf-8", errors="replace")
+    )
+
+
+@contextlib.contextmanager
+def _script_environment(script_path: str, args: List[str], chdir: bool):
+    """
+    为一次脚本调用设置 sys.argv、sys.path 和工作目录，调用结束后全部恢复。
+    
+    调用期间从脚本目录导入的模块（例如同目录的 utils.py）在结束后从
+    sys.modules 移除，之后运行的其他 skill 的同名模块不会取到它们。
+    
+    参数:
+        script_path: 脚本路径
+        args: 命令行参数（不含脚本路径）
+        chdir: 是否切换到脚本所在目录
+    """
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    saved_cwd = os.getcwd() if chdir else None
+    saved_modules = set(sys.modules)
+    
+    sys.path.insert(0, script_dir)
+    sys.argv = [script_path, *args]
+    if chdir:
+        os.chdir(script_dir)
+    
+    try:
+        yield
+    finally:
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+        if saved_cwd is not None:
+            os.chdir(saved_cwd)
+        
+        prefix = script_dir + os.sep
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file and os.path.abspath(module_file).startswith(prefix):
+                del sys.modules[name]
+
+
+@contextlib.contextmanager
+def _capture_output():
+    """
+    将文件描述符 1/2 及 sys.stdout/sys.stderr 重定向到临时文件，结束后恢复。
+    
+    只替换 sys.stdout 捕获不到脚本启动的子进程和扩展模块直接写入 fd 1/2 的
+    输出，因此用 os.dup2 在文件描述符层面重定向。重定向对整个进程生效。
+    
+    产出:
+        列表，退出时依次填入解码后的 stdout 和 stderr
+    """
+    output: List[str] = []
+    with tempfile.TemporaryFile() as out_file, tempfile.TemporaryFile() as err_file:
+        saved_streams = (sys.stdout, sys.stderr)
+        for stream in saved_streams:
+            with contextlib.suppress(Exception):
+                stream.flush()
+        saved_fds = (os.dup(1), os.dup(2))
+        os.dup2(out_file.fileno(), 1)
+        os.dup2(err_file.fileno(), 2)
+        # 不经缓冲直接写入 fd，与子进程的输出保持先后顺序
+        sys.stdout, sys.stderr = (
+            io.TextIOWrapper(io.FileIO(fd, "w", closefd=False), encoding="utf-8", errors="replace", write_through=True)
+            for fd in (1, 2)
+        )
+        
+        try:
+            yield output
+        finally:
+            sys.stdout, sys.stderr = saved_streams
+            for fd, saved_fd in zip((1, 2), saved_fds):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+            for captured in (out_file, err_file):
+                captured.seek(0)
+                output.append(captured.read().decode("utf-8", errors="replace"))
+
+
+def _run_script_captured(script_path: str, args: List[str], chdir: bool) -> Tuple[int, str, str]:
+    """
+    在当前进程中以 __main__ 方式运行脚本，行为与 python script.py 一致。
+    
+    脚本的 __main__ 守卫完整执行，sys.exit(main()) 中 main() 的返回值经
+    SystemExit 成为返回码；未捕获的异常以返回码 1 和 traceback 返回。
+    sys.argv、标准输出和 fd 1/2 都是进程全局的，调用方负责串行化。
+    
+    参数:
+        script_path: 脚本路径
+        args: 命令行参数（不含脚本路径）
+        chdir: 是否切换到脚本所在目录
+        
+    返回:
+        (返回码, stdout, stderr) 元组
+    """
+    returncode = 0
+    
+    with _script_environment(script_path, args, chdir), _capture_output() as output:
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                returncode = e.code
+            elif e.code is not None:
+                returncode = 1
+                print(e.code, file=sys.stderr)
+        except Exception:
+            returncode = 1
+            traceback.print_exc()
+    
+    return returncode, output[0], output[1]
+
+
+def _run_script_in_worker(script_path: str, args: List[str]) -> Tuple[int, str, str]:
+    """
+    在工作进程中运行 skill 脚本，模拟命令行调用。
+    
+    工作进程一次只运行一个任务；工作目录、sys.path、sys.argv 和脚本目录中
+    导入的模块在调用结束后恢复，同一工作进程之后运行的脚本不受影响。
+    
+    参数:
+        script_path: 脚本路径
+        args: 命令行参数（不含脚本路径）
+        
+    返回:
+        (返回码, stdout, stderr) 元组
+    """
+    return _run_script_captured(script_path, args, chdir=True)
+
+
+def _run_script_in_process(script_path: str, args: List[str]) -> Tuple[int, str, str]:
+    """
+    在当前进程中运行可信脚本，不经过进程池。
+    
+    与工作进程共用 _run_script_captured。sys.argv、标准输出和 fd 1/2 的重定向
+    是进程全局的，因此调用之间用锁串行化，调用期间其他线程写入 fd 1/2 的输出
+    也会被一并捕获；不切换工作目录，脚本需不依赖当前目录。
+    
+    参数:
+        script_path: 脚本路径
+        args: 命令行参数（不含脚本路径）
+        
+    返回:
+        (返回码, stdout, stderr) 元组
+    """
+    with _IN_PROCESS_LOCK:
+        return _run_script_captured(script_path, args, chdir=False)
+
+
+# 生成的参数构造函数体中使用的名称，脚本参数与之同名时不做特化
+_ARGV_BUILDER_RESERVED = frozenset({"build", "cmd", "str"})
+
+
+def _compile_argv_builder(script_path: str) -> Optional[Callable[..., List[str]]]:
+    """
+    根据脚本中的 argparse 定义生成专用的命令行参数构造函数。
+    
+    解析脚本源码中的 add_argument 调用（不执行脚本），按参数名生成
+    形如 build(input, output=None, *, force=False) 的函数，调用时不再
+    遍历 args/kwargs。只支持必需位置参数、普通选项和 store_true 开关，
+    遇到其他用法（nargs、append 等）时返回 None，由调用方使用通用构造。
+    
+    参数:
+        script_path: 脚本路径
+        
+    返回:
+        参数构造函数；无法特化时返回 None
+    """
+    try:
+        with open(script_path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return None
+    
+    positionals: List[str] = []
+    options: List[Tuple[str, str, bool]] = []  # (dest, 选项字符串, 是否为开关)
+    
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "add_argument"
+        ):
+            continue
+        
+        flags = [arg.value for arg in node.args if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+        if not flags or len(flags) != len(node.args):
+            return None
+        
+        keywords = {kw.arg: kw.value for kw in node.keywords}
+        if "nargs" in keywords:
+            return None
+        
+        action = keywords.get("action")
+        is_switch = isinstance(action, ast.Constant) and action.value == "store_true"
+        if action is not None and not is_switch:
+            return None
+        
+        dest_node = keywords.get("dest")
+        if dest_node is not None and not (isinstance(dest_node, ast.Constant) and isinstance(dest_node.value, str)):
+            return None
+        
+        if not flags[0].startswith("-"):
+            positionals.append(dest_node.value if dest_node is not None else flags[0])
+            continue
+        
+        option = next((flag for flag in flags if flag.startswith("--")), flags[0])
+        dest = dest_node.value if dest_node is not None else option.lstrip("-").replace("-", "_")
+        options.append((dest, option, is_switch))
+    
+    # 参数名直接写入生成的源码，必须是合法标识符，且不能与函数体中使用的名称冲突
+    names = positionals + [dest for dest, _, _ in options]
+    if not names or any(
+        not name.isidentifier() or keyword.iskeyword(name) or name in _ARGV_BUILDER_RESERVED
+        for name in names
+    ):
+        return None
+    if len(set(names)) != len(names):
+        return None
+    
+    params = positionals + ([
+        "*",
+        *(f"{dest}=False" if is_switch else f"{dest}=None" for dest, _, is_switch in options)
+    ] if options else [])
+    lines = [
+        f"def build({', '.join(params)}):",
+        f"    cmd = [{', '.join(f'str({name})' for name in positionals)}]"
+    ]
+    for dest, option, is_switch in options:
+        if is_switch:
+            lines.append(f"    if {dest}:")
+            lines.append(f"        cmd.append({option!r})")
+        else:
+            lines.append(f"    if {dest} is not None:")
+            lines.append(f"        cmd.append({option + '='!r} + str({dest}))")
+    lines.append("    return cmd")
+    
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return namespace["build"]
+
+
+def _as_tool(obj: Any) -> Callable:
+    """
+    将工具对象包装为 Agno 可注册的普通函数。
+    
+    Agno 只接受函数作为工具（不接受可调用实例），包装函数复制
+    __call__ 的签名，并使用对象的 __name__/__doc__ 作为工具元数据。
+    
+    参数:
+        obj: ScriptRunner、ReferenceReader 或 AssetsLister 实例
+        
+    返回:
+        转发到 obj 的函数
+    """
+    call = obj.__call__
+    
+    def tool(*args, **kwargs):
+        return call(*args, **kwargs)
+    
+    functools.update_wrapper(tool, call)
+    tool.__name__ = obj.__name__
+    tool.__doc__ = obj.__doc__
+    return tool
+
+
+# 以下工具类使用 __slots__，状态只保存路径和名称，逻辑由同一个类共享。
+# __doc__ 作为实例槽位保存各工具的描述，因此这些类不能带类文档字符串。
+
+
+class ScriptRunner:
+    # 使用提供的参数运行 skill 脚本：位置参数原样传递，关键字参数以 --key=value 形式传递
+    
+    __slots__ = (
+        "script_path", "skill_name", "_script_path_str", "_base_cmd", "_cwd",
+        "_argv_builder", "_in_process", "__name__", "__doc__"
+    )
+    
+    def __init__(self, script_path: Path, skill_name: str, in_process: bool = False):
+        self.script_path = script_path
+        self.skill_name = skill_name
+        
+        # 可信脚本直接在当前进程中运行，不经过进程池
+        self._in_process = in_process
+        
+        # 每次调用都相同的部分预先转换为字符串
+        self._script_path_str = str(script_path)
+        self._base_cmd = (sys.executable, self._script_path_str)
+        self._cwd = str(script_path.parent)
+        
+        # 按脚本 argparse 定义生成的参数构造函数，首次调用时编译；False 表示无法特化
+        self._argv_builder: Any = None
+        
+        # 为 Agno 设置函数元数据
+        script_name = script_path.stem
+        self.__name__ = f"{skill_name}_{script_name}"
+        self.__doc__ = f"从 {skill_name} skill 运行 {script_name} 脚本。使用 --help 标志查看脚本用法。"
+    
+    @staticmethod
+    def _build_args(args: tuple, kwargs: Dict[str, Any]) -> List[str]:
+        """将调用参数转换为命令行参数。"""
+        # 添加位置参数
+        cmd_args = list(map(str, args))
+        
+        # 添加关键字参数为 --key=value
+        cmd_args.extend(f"--{key}={value}" for key, value in kwargs.items())
+        
+        return cmd_args
+    
+    def _argv(self, args: tuple, kwargs: Dict[str, Any]) -> List[str]:
+        """构造命令行参数，优先使用特化的构造函数，调用方式不匹配时回退为通用构造。"""
+        builder = self._argv_builder
+        if builder is None:
+            builder = self._argv_builder = _compile_argv_builder(self._script_path_str) or False
+        
+        if builder:
+            try:
+                return builder(*args, **kwargs)
+            except TypeError:
+                pass
+        
+        return self._build_args(args, kwargs)
+    
+    def __call__(self, *args, **kwargs) -> str:
+        cmd_args = self._argv(args, kwargs)
+        
+        try:
+            if self._in_process:
+                returncode, stdout, stderr = _run_script_in_process(self._script_path_str, cmd_args)
+                return f"Error running script: {stderr}" if returncode != 0 else stdout
+            
+            executor = _get_executor()
+            future = executor.submit(
+                _run_script_in_worker,
+                self._script_path_str,
+                cmd_args
+            )
+            try:
+                returncode, stdout, stderr = future.result(timeout=300)  # 5 分钟超时
+            except FutureTimeoutError:
+                # 终止仍在运行脚本的工作进程
+                _reset_executor(executor, terminate=True)
+                return "Error: Script execution timed out (5 minutes)"
+            except BrokenProcessPool:
+                # 工作进程崩溃，重建进程池并以子进程方式重试
+                _reset_executor(executor)
+                cmd = list(self._base_cmd)
+                cmd.extend(cmd_args)
+                returncode, stdout, stderr = _run_subprocess(cmd, timeout=300, cwd=self._cwd)
+            
+            if returncode != 0:
+                return f"Error running script: {stderr}"
+            
+            return stdout
+            
+        except subprocess.TimeoutExpired:
+            return "Error: Script execution timed out (5 minutes)"
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+
+class ReferenceReader:
+    # 从 skill 的 references 目录读取参考文件
+    
+    __slots__ = ("references_dir", "skill_name", "__name__", "__doc__")
+    
+    def __init__(self, references_dir: Path, skill_name: str):
+        self.references_dir = references_dir
+        self.skill_name = skill_name
+        self.__name__ = f"{skill_name}_read_reference"
+        self.__doc__ = f"从 {skill_name} skill 读取参考文档。提供要读取的文件名。"
+    
+    def __call__(self, filename: str) -> str:
+        ref_path = self.references_dir / filename
+        
+        try:
+            st = ref_path.stat()
+        except OSError:
+            # 列出可用的参考文件
+            with os.scandir(self.references_dir) as it:
+                available = [entry.name for entry in it if entry.is_file()]
+            return f"Reference file '{filename}' not found. Available references: {', '.join(available)}"
+        
+        try:
+            # 文件未变化时直接返回缓存内容，只需一次 stat
+            return _read_text_cached(str(ref_path), st.st_mtime_ns, st.st_size)
+        except Exception as e:
+            return f"Error reading reference: {str(e)}"
+
+
+class AssetsLister:
+    # 列出 skill 的 assets 目录中可用的资源，pattern 为过滤用的 glob 模式（默认 "*" 表示全部）
+    
+    __slots__ = ("assets_dir", "skill_name", "__name__", "__doc__")
+    
+    def __init__(self, assets_dir: Path, skill_name: str):
+        self.assets_dir = assets_dir
+        self.skill_name = skill_name
+        self.__name__ = f"{skill_name}_list_assets"
+        self.__doc__ = f"列出 {skill_name} skill 的资源文件。可选提供 glob 模式进行过滤。"
+    
+    def __call__(self, pattern: str = "*") -> str:
+        assets_dir = self.assets_dir
+        
+        try:
+            if "/" in pattern or "**" in pattern:
+                # 跨目录的模式仍交给 pathlib 递归匹配
+                assets = [
+                    (str(asset.relative_to(assets_dir)), asset.is_dir())
+                    for asset in assets_dir.glob(pattern)
+                ]
+            else:
+                entries = _scandir_cached(str(assets_dir), os.stat(assets_dir).st_mtime_ns)
+                match = _compile_glob(pattern)
+                assets = [(name, entry_is_dir) for name, entry_is_dir in entries if match(name)]
+            
+            if not assets:
+                return f"No assets found matching pattern '{pattern}'"
+            
+            result = [f"Assets in {self.skill_name}:"]
+            for rel_path, asset_is_dir in assets:
+                asset_type = "dir" if asset_is_dir else "file"
+                result.append(f"- {rel_path} ({asset_type})")
+            
+            return "\n".join(result)
+        except Exception as e:
+            return f"Error listing assets: {str(e)}"
+
+
+class MetadataCache:
+    """
+    有界的 LRU 缓存，条目超过存活时间后失效。
+    
+    SkillExecutor 的脚本、参考文档和工具缓存共用一个实例，
+    以 (类别, skill 名称) 为键，长时间运行时内存占用有上限。
+    """
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 3600,
+                 on_evict: Optional[Callable[[Tuple[str, str], Any], None]] = None):
+        """
+        初始化缓存。
+        
+        参数:
+            maxsize: 最大条目数，超出时淘汰最久未使用的条目
+            ttl: 条目存活时间（秒）
+            on_evict: 条目被淘汰、过期或被新值替换时以 (键, 旧值) 调用
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._on_evict = on_evict
+        # 键 -> (过期时间, 值)，按最近使用顺序排列
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def get(self, key: Tuple[str, str], default: Any = None) -> Any:
+        """
+        查找条目，命中时将其标记为最近使用。
+        
+        参数:
+            key: (类别, skill 名称) 键
+            default: 未命中或已过期时返回的值
+            
+        返回:
+            缓存的值或 default
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            del self._data[key]
+            self._evicted(key, entry[1])
+        self._misses += 1
+        return default
+    
+    def peek(self, key: Tuple[str, str], default: Any = None) -> Any:
+        """查找未过期的条目，不改变使用顺序和统计计数。"""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+    
+    def set(self, key: Tuple[str, str], value: Any):
+        """存入条目，超出容量时淘汰最久未使用的条目。"""
+        old = self._data.get(key)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if old is not None and old[1] is not value:
+            self._evicted(key, old[1])
+        while len(self._data) > self.maxsize:
+            evicted_key, (_, evicted_value) = self._data.popitem(last=False)
+            self._evictions += 1
+            self._evicted(evicted_key, evicted_value)
+    
+    def _evicted(self, key: Tuple[str, str], value: Any):
+        """通知 on_evict 条目已移出缓存。"""
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+    
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def clear(self):
+        """清空所有条目（统计计数保留）。"""
+        self._data.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        返回缓存统计，用于调整 maxsize 和 ttl。
+        
+        返回:
+            包含 hits、misses、evictions 和 size 的字典
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "size": len(self._data),
+        }
+
+
 class SkillExecutor:
     """执行 skill 资源并将其转换为 Agno 兼容的工具。"""
     
-    def __init__(self):
-        self._loaded_scripts: Dict[str, List[Callable]] = {}
-        self._loaded_references: Dict[str, str] = {}
+    def __init__(self, cache_maxsize: int = 512, cache_ttl: float = 3600, trusted_scripts: bool = False):
+        """
+        初始化执行器。
+        
+        参数:
+            cache_maxsize: 缓存的最大条目数
+            cache_ttl: 缓存条目的存活时间（秒）
+            trusted_scripts: 信任 skill 脚本，脚本直接在当前进程中运行，省去进程间通信；
+                             调用之间串行执行，脚本修改全局状态或挂起会影响 agent 本身
+        """
+        self.trusted_scripts = trusted_scripts
+        
+        # 脚本工具、参考文档和完整工具列表共用一个有界缓存，
+        # 键为 ("scripts" | "refs" | "tools", skill 名称)
+        self._cache = MetadataCache(maxsize=cache_maxsize, ttl=cache_ttl, on_evict=self._unindex_tools)
+        
+        # 单个参考文件的内容单独缓存，键为 ("ref_file", 文件路径)，
+        # 文件数量多时不会挤出上面的工具条目
+        self._ref_file_cache = MetadataCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        
+        # 工具名称 -> 工具函数，按名称直接分发，无需遍历各 skill 的工具列表；
+        # 工具列表移出缓存时同步删除，大小不超过缓存中的工具数
+        self._tool_index: Dict[str, Callable] = {}
+    
+    def stats(self) -> Dict[str, int]:
+        """返回缓存命中、未命中和淘汰次数。"""
+        return self._cache.stats()
+    
+    def get_tool(self, name: str) -> Optional[Callable]:
+        """
+        按名称获取已创建的工具。
+        
+        参数:
+            name: 工具名称，如 "{skill_name}_{script_name}"
+            
+        返回:
+            工具函数，未创建时返回 None
+        """
+        return self._tool_index.get(name)
+    
+    def _index_tool(self, tool: Callable) -> Callable:
+        """将工具登记到名称索引并原样返回。"""
+        self._tool_index[tool.__name__] = tool
+        return tool
+    
+    def _unindex_tools(self, key: Tuple[str, str], value: Any):
+        """
+        工具列表移出缓存时，从名称索引中删除其中的工具。
+        
+        "scripts" 和 "tools" 条目共享同一批脚本工具，另一个条目仍在缓存中时保留。
+        
+        参数:
+            key: 被移出的缓存键
+            value: 被移出的缓存值
+        """
+        kind, skill_name = key
+        if kind not in ("scripts", "tools"):
+            return
+        
+        other = self._cache.peek(("tools" if kind == "scripts" else "scripts", skill_name)) or ()
+        for tool in value:
+            name = tool.__name__
+            if self._tool_index.get(name) is tool and not any(t is tool for t in other):
+                del self._tool_index[name]
+    
+    def prewarm(self, skill_content: SkillContent) -> List[Callable]:
+        """
+        预先扫描 skill 资源并构建其全部工具。
+        
+        在服务请求之前调用，使之后的 create_agno_tools 只是一次字典查找。
+        
+        参数:
+            skill_content: 包含资源路径的完整 skill 内容
+            
+        返回:
+            该 skill 的工具列表
+        """
+        tools = self._build_tools(skill_content)
+        self._cache.set(("tools", skill_content.metadata.name), tools)
+        
+        # 有脚本的 skill 需要进程池，一并启动工作进程
+        if skill_content.scripts_dir:
+            _warm_executor()
+        
+        return tools
     
     def create_agno_tools(self, skill_content: SkillContent) -> List[Callable]:
         """
@@ -32,6 +1031,23 @@ class SkillExecutor:
         返回:
             用作 Agno 工具的可调用函数列表
         """
+        key = ("tools", skill_content.metadata.name)
+        tools = self._cache.get(key)
+        if tools is None:
+            tools = self._build_tools(skill_content)
+            self._cache.set(key, tools)
+        return tools
+    
+    def _build_tools(self, skill_content: SkillContent) -> List[Callable]:
+        """
+        扫描 skill 资源并创建对应的工具函数。
+        
+        参数:
+            skill_content: 包含资源路径的完整 skill 内容
+            
+        返回:
+            可调用函数列表
+        """
         tools = []
         skill_name = skill_content.metadata.name
         
@@ -72,19 +1088,22 @@ class SkillExecutor:
         返回:
             可调用包装函数列表
         """
-        if skill_name in self._loaded_scripts:
-            return self._loaded_scripts[skill_name]
+        cached = self._cache.get(("scripts", skill_name))
+        if cached is not None:
+            return cached
         
         tools = []
         
-        # 查找所有 Python 文件
-        python_files = list(scripts_dir.glob("*.py"))
+        # 查找所有 Python 文件，跳过 __init__.py 和私有文件；按名称排序，
+        # 使工具顺序（随请求发送给模型的工具定义）不依赖文件系统的枚举顺序
+        with os.scandir(scripts_dir) as it:
+            python_files = sorted(
+                scripts_dir / entry.name
+                for entry in it
+                if entry.is_file() and entry.name.endswith(".py") and not entry.name.startswith("_")
+            )
         
         for script_path in python_files:
-            # 跳过 __init__.py 和私有文件
-            if script_path.name.startswith("_"):
-                continue
-            
             try:
                 tool = self._create_script_runner(script_path, skill_name)
                 tools.append(tool)
@@ -92,151 +1111,51 @@ class SkillExecutor:
                 print(f"Warning: Failed to load script {script_path}: {e}")
                 continue
         
-        self._loaded_scripts[skill_name] = tools
+        self._cache.set(("scripts", skill_name), tools)
         return tools
     
     def _create_script_runner(self, script_path: Path, skill_name: str) -> Callable:
         """
-        创建运行 Python 脚本的包装函数。
+        创建运行 Python 脚本的包装对象。
         
-        不导入脚本（可能有复杂依赖），
-        而是创建一个作为子进程运行它的函数。
+        脚本在常驻进程池中运行，而不是导入到当前进程（可能有复杂依赖），
+        避免每次调用都启动新的解释器。进程池不可用时回退为子进程。
+        启用 trusted_scripts 时，脚本直接在当前进程中运行。
         
         参数:
             script_path: Python 脚本路径
             skill_name: skill 名称
             
         返回:
-            可调用包装函数
+            包装 ScriptRunner 的可调用函数
         """
-        script_name = script_path.stem
-        
-        def run_script(*args, **kwargs) -> str:
-            """
-            使用提供的参数运行 skill 脚本。
-            
-            参数:
-                *args: 传递给脚本的位置参数
-                **kwargs: 以 --key=value 形式传递的关键字参数
-                
-            返回:
-                脚本输出字符串
-            """
-            cmd = [sys.executable, str(script_path)]
-            
-            # 添加位置参数
-            for arg in args:
-                cmd.append(str(arg))
-            
-            # 添加关键字参数为 --key=value
-            for key, value in kwargs.items():
-                cmd.append(f"--{key}={value}")
-            
-            try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300,  # 5 分钟超时
-                    cwd=script_path.parent
-                )
-                
-                if result.returncode != 0:
-                    return f"Error running script: {result.stderr}"
-                
-                return result.stdout
-                
-            except subprocess.TimeoutExpired:
-                return "Error: Script execution timed out (5 minutes)"
-            except Exception as e:
-                return f"Error: {str(e)}"
-        
-        # 为 Agno 设置函数元数据
-        run_script.__name__ = f"{skill_name}_{script_name}"
-        run_script.__doc__ = f"从 {skill_name} skill 运行 {script_name} 脚本。使用 --help 标志查看脚本用法。"
-        
-        return run_script
+        return self._index_tool(_as_tool(ScriptRunner(script_path, skill_name, in_process=self.trusted_scripts)))
     
     def _create_reference_accessor(self, references_dir: Path, skill_name: str) -> Callable:
         """
-        创建访问参考文档的工具函数。
+        创建访问参考文档的工具。
         
         参数:
             references_dir: references 目录路径
             skill_name: skill 名称
             
         返回:
-            读取参考文件的可调用函数
+            包装 ReferenceReader 的可调用函数
         """
-        def read_reference(filename: str) -> str:
-            """
-            从 skill 的 references 目录读取参考文件。
-            
-            参数:
-                filename: 参考文件名称（例如 'finance.md', 'REFERENCE.md'）
-                
-            返回:
-                参考文件内容
-            """
-            ref_path = references_dir / filename
-            
-            if not ref_path.exists():
-                # 列出可用的参考文件
-                available = [f.name for f in references_dir.iterdir() if f.is_file()]
-                return f"Reference file '{filename}' not found. Available references: {', '.join(available)}"
-            
-            try:
-                with open(ref_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                return content
-            except Exception as e:
-                return f"Error reading reference: {str(e)}"
-        
-        read_reference.__name__ = f"{skill_name}_read_reference"
-        read_reference.__doc__ = f"从 {skill_name} skill 读取参考文档。提供要读取的文件名。"
-        
-        return read_reference
+        return self._index_tool(_as_tool(ReferenceReader(references_dir, skill_name)))
     
     def _create_assets_accessor(self, assets_dir: Path, skill_name: str) -> Callable:
         """
-        创建列出和访问资源的工具函数。
+        创建列出和访问资源的工具。
         
         参数:
             assets_dir: assets 目录路径
             skill_name: skill 名称
             
         返回:
-            处理资源的可调用函数
+            包装 AssetsLister 的可调用函数
         """
-        def list_assets(pattern: str = "*") -> str:
-            """
-            列出 skill 的 assets 目录中可用的资源。
-            
-            参数:
-                pattern: 过滤资源的 Glob 模式（默认："*" 表示全部）
-                
-            返回:
-                资源文件及其路径列表
-            """
-            try:
-                assets = list(assets_dir.glob(pattern))
-                if not assets:
-                    return f"No assets found matching pattern '{pattern}'"
-                
-                result = [f"Assets in {skill_name}:"]
-                for asset in assets:
-                    rel_path = asset.relative_to(assets_dir)
-                    asset_type = "dir" if asset.is_dir() else "file"
-                    result.append(f"- {rel_path} ({asset_type})")
-                
-                return "\n".join(result)
-            except Exception as e:
-                return f"Error listing assets: {str(e)}"
-        
-        list_assets.__name__ = f"{skill_name}_list_assets"
-        list_assets.__doc__ = f"列出 {skill_name} skill 的资源文件。可选提供 glob 模式进行过滤。"
-        
-        return list_assets
+        return self._index_tool(_as_tool(AssetsLister(assets_dir, skill_name)))
     
     def load_skill_references(self, references_dir: Path, skill_name: str) -> str:
         """
@@ -251,22 +1170,67 @@ class SkillExecutor:
         返回:
             所有参考文件的合并内容
         """
-        if skill_name in self._loaded_references:
-            return self._loaded_references[skill_name]
+        # 各文件在读取时已按 UTF-8 严格校验，无法解码的文件以错误信息代替
+        combined = self.load_skill_references_bytes(references_dir, skill_name)
+        return combined.decode("utf-8")
+    
+    def load_skill_references_bytes(self, references_dir: Path, skill_name: str) -> bytes:
+        """
+        将所有参考内容加载为 UTF-8 字节。
         
-        content_parts = [f"# References for {skill_name} skill\n"]
+        缓存以字节形式保存，比 str 更省内存；需要序列化为 UTF-8 的
+        调用方可以直接使用，无需解码再编码。每次调用扫描一次目录，
+        文件列表和 mtime 都未变化时直接返回缓存；否则只重新读取变化的文件。
         
-        for ref_file in references_dir.glob("*.md"):
-            try:
-                with open(ref_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-                content_parts.append(f"\n## {ref_file.name}\n")
-                content_parts.append(content)
-            except Exception as e:
-                content_parts.append(f"\n## {ref_file.name}\nError loading: {e}\n")
+        参数:
+            references_dir: references 目录路径
+            skill_name: skill 名称
+            
+        返回:
+            所有参考文件的合并内容（UTF-8 字节）
+        """
+        # 一次目录扫描取得所有参考文件及其 (mtime, 大小)，按文件名排序保证输出稳定
+        with os.scandir(references_dir) as it:
+            ref_entries = sorted(
+                (entry.name, entry.stat())
+                for entry in it
+                if entry.name.endswith(".md") and entry.is_file()
+            )
+        signature = tuple((name, st.st_mtime_ns, st.st_size) for name, st in ref_entries)
+        
+        cached = self._cache.get(("refs", skill_name))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
         
-        combined = "\n".join(content_parts)
-        self._loaded_references[skill_name] = combined
+        # 逐文件缓存内容，只重新读取新增或修改过的文件
+        contents: Dict[str, Any] = {}
+        stale: List[Tuple[str, int, int]] = []
+        for name, mtime_ns, size in signature:
+            entry = self._ref_file_cache.get(("ref_file", str(references_dir / name)))
+            if entry is not None and entry[:2] == (mtime_ns, size):
+                contents[name] = entry[2]
+            else:
+                stale.append((name, mtime_ns, size))
+        
+        stale_paths = [references_dir / name for name, _, _ in stale]
+        raw_contents = _read_files(stale_paths)
+        for (name, mtime_ns, size), path in zip(stale, stale_paths):
+            raw = raw_contents[path]
+            contents[name] = raw
+            if not isinstance(raw, Exception):
+                self._ref_file_cache.set(("ref_file", str(path)), (mtime_ns, size, raw))
+        
+        content_parts = [f"# References for {skill_name} skill\n".encode("utf-8")]
+        for name, _, _ in signature:
+            raw = contents[name]
+            if isinstance(raw, Exception):
+                content_parts.append(f"\n## {name}\nError loading: {raw}\n".encode("utf-8"))
+            else:
+                content_parts.append(f"\n## {name}\n".encode("utf-8"))
+                content_parts.append(raw)
+        
+        combined = b"\n".join(content_parts)
+        self._cache.set(("refs", skill_name), (signature, combined))
         
         return combined
     
@@ -281,17 +1245,13 @@ class SkillExecutor:
             帮助文本输出
         """
         try:
-            result = subprocess.run(
-                [sys.executable, str(script_path), "--help"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.stdout
+            _, stdout, _ = _run_subprocess([sys.executable, str(script_path), "--help"], timeout=10)
+            return stdout
         except Exception as e:
             return f"Could not get help: {str(e)}"
     
     def clear_cache(self):
         """清除所有缓存的脚本和参考文档。"""
-        self._loaded_scripts.clear()
-        self._loaded_references.clear()
+        self._cache.clear()
+        self._ref_file_cache.clear()
+        self._tool_index.clear()
@@ -5,47 +5,353 @@ Skill Loader - 发现和加载 Agent Skills 的元数据和内容。
 仅在需要时才加载完整内容。
 """
 
-import re
+import os
+import json
+import mmap
+import codecs
+import hashlib
 import yaml
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
-from dataclasses import dataclass
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 
+# 优先使用 libyaml 的 C 实现解析 frontmatter，未编译 libyaml 时回退为纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-class SkillMetadata(BaseModel):
-    """从 SKILL.md frontmatter 提取的 skill 元数据。"""
+
+def _frontmatter_bounds(content: Union[str, bytes, mmap.mmap]) -> Optional[Tuple[int, int, int]]:
+    """
+    定位 Markdown 内容中由 --- 分隔的 YAML frontmatter。
+    
+    只用切片和 find 做查找，不使用正则表达式；同时支持 str、bytes 和
+    mmap，对 mmap 只访问结尾 --- 之前的部分。
+    
+    参数:
+        content: Markdown 内容
+        
+    返回:
+        (frontmatter 起点, frontmatter 终点, 正文起点) 元组，未找到时返回 None
+    """
+    if isinstance(content, str):
+        newline, dashes = "\n", "---"
+    else:
+        newline, dashes = b"\n", b"---"
+    marker = newline + dashes
+    
+    if content[:3] != dashes:
+        return None
+    
+    # 开头的 --- 之后只允许空白
+    start = content.find(newline, 3)
+    if start == -1 or content[3:start].strip():
+        return None
+    start += 1
+    
+    # 结尾的 --- 必须独占一行（允许尾随空白）
+    end = content.find(marker, start - 1)
+    while end != -1:
+        line_end = content.find(newline, end + 4)
+        if line_end != -1 and not content[end + 4:line_end].strip():
+            return start, end, line_end + 1
+        end = content.find(marker, end + 1)
+    return None
+
+
+def _read_frontmatter(skill_md_path: Path) -> Optional[Tuple[str, int, int, int]]:
+    """
+    通过内存映射读取 SKILL.md 的 frontmatter，正文部分不会被解码。
+    
+    参数:
+        skill_md_path: SKILL.md 文件路径
+        
+    返回:
+        (frontmatter 文本, 正文字节偏移, 文件 mtime, 文件大小) 元组；
+        文件没有有效 frontmatter 时返回 None
+    """
+    with open(skill_md_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            # 空文件无法映射
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = _frontmatter_bounds(mm)
+            if bounds is None:
+                return None
+            return mm[bounds[0]:bounds[1]].decode("utf-8"), bounds[2], st.st_mtime_ns, st.st_size
+
+
+def _read_body(
+    skill_md_path: Path,
+    body_ref: Optional[Tuple[int, int, int]] = None,
+    limit: Optional[int] = None,
+) -> Optional[str]:
+    """
+    读取并解码 SKILL.md 的正文（frontmatter 之后的部分）。
     
-    name: str = Field(description="从 frontmatter 获取的 skill 名称")
-    description: str = Field(description="Skill 描述 - 何时使用此 skill")
-    path: Path = Field(description="skill 目录的完整路径")
-    license: Optional[str] = Field(default=None, description="许可证信息")
-    compatibility: Optional[str] = Field(default=None, description="兼容性要求")
-    metadata: Optional[Dict[str, str]] = Field(default=None, description="附加元数据")
+    提供发现阶段记录的 (mtime, 大小, 正文偏移) 且文件的 mtime 和大小都未变化时，
+    直接 seek 到正文读取，无需再次查找 frontmatter；否则通过内存映射重新定位。
     
-    class Config:
-        arbitrary_types_allowed = True
+    参数:
+        skill_md_path: SKILL.md 文件路径
+        body_ref: 发现阶段记录的 (mtime, 大小, 正文字节偏移)（可选）
+        limit: 最多读取的正文字节数（可选）；截断处不完整的 UTF-8 字符被丢弃
+        
+    返回:
+        正文文本；文件没有有效 frontmatter 时返回 None
+    """
+    with open(skill_md_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if body_ref and body_ref[0] == st.st_mtime_ns and body_ref[1] == st.st_size:
+            f.seek(body_ref[2])
+            data = f.read() if limit is None else f.read(limit)
+        elif st.st_size == 0:
+            # 空文件无法映射
+            return None
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                bounds = _frontmatter_bounds(mm)
+                if bounds is None:
+                    return None
+                data = mm[bounds[2]:] if limit is None else mm[bounds[2]:bounds[2] + limit]
+    if limit is None:
+        return data.decode("utf-8")
+    # 增量解码器在 final=False 时保留末尾不完整的字符而不报错
+    return codecs.getincrementaldecoder("utf-8")().decode(data)
+
+
+def _frontmatter_digest(prefix: bytes) -> str:
+    """计算 SKILL.md 正文偏移之前部分的摘要，frontmatter 的位置只取决于这部分内容。"""
+    return hashlib.blake2b(prefix, digest_size=16).hexdigest()
+
 
+def _cache_key(skill_md_path: Path) -> str:
+    """磁盘缓存的键：解析后的绝对路径，不同目录下相同的相对路径不会互相命中。"""
+    return str(Path(skill_md_path).resolve())
 
-class SkillContent(BaseModel):
-    """包含元数据和指令的完整 skill 内容。"""
+
+class _ParsedFrontmatter:
+    """从磁盘缓存取得的已解析 frontmatter，在发现流程中与待解析的文本区分。"""
+    
+    __slots__ = ("data",)
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+
+def _load_yaml_documents(texts: List[str]) -> List[Any]:
+    """
+    解析多段 YAML 文本。
+    
+    多段文本以文档分隔符拼接后由一次 yaml.load_all 解析，分摊解析器的
+    初始化开销。文本中含有指令（%）或文档结束标记（...）时无法安全拼接，
+    批量解析出错或文档数不符时，也回退为逐段解析，使错误只影响对应的一段。
+    
+    参数:
+        texts: YAML 文本列表
+        
+    返回:
+        与 texts 顺序对应的解析结果；解析失败的一段对应其 yaml.YAMLError
+    """
+    batchable = len(texts) > 1 and not any(
+        text.startswith(("%", "...")) or "\n..." in text for text in texts
+    )
+    if batchable:
+        try:
+            documents = list(yaml.load_all("\n---\n".join(texts), Loader=_YamlLoader))
+            if len(documents) == len(texts):
+                return documents
+        except yaml.YAMLError:
+            pass
+    
+    documents = []
+    for text in texts:
+        try:
+            documents.append(yaml.load(text, Loader=_YamlLoader))
+        except yaml.YAMLError as e:
+            documents.append(e)
+    return documents
+
+
+@dataclass(slots=True, frozen=True)
+class SkillMetadata:
+    """
+    从 SKILL.md frontmatter 提取的 skill 元数据。
+    
+    实例不可变，缓存命中时直接返回同一对象，无需复制。
+    """
+    
+    name: str                                   # 从 frontmatter 获取的 skill 名称
+    description: str                            # Skill 描述 - 何时使用此 skill
+    path: Path                                  # skill 目录的完整路径
+    license: Optional[str] = None               # 许可证信息
+    compatibility: Optional[str] = None         # 兼容性要求
+    metadata: Optional[Dict[str, str]] = None   # 附加元数据
+    scripts_dir: Optional[Path] = None          # scripts 目录路径（发现时确定）
+    references_dir: Optional[Path] = None       # references 目录路径（发现时确定）
+    assets_dir: Optional[Path] = None           # assets 目录路径（发现时确定）
+
+
+@dataclass(slots=True, frozen=True, init=False)
+class SkillContent:
+    """
+    包含元数据和指令的完整 skill 内容。
+    
+    指令正文延迟读取：构造时只记录 SKILL.md 路径，首次访问 instructions
+    时才映射文件并解码正文，之后保存在实例上。除这一延迟填充外实例不可变，
+    缓存命中时直接返回同一对象。
+    """
     
     metadata: SkillMetadata
-    instructions: str = Field(description="完整的 SKILL.md 正文内容")
-    scripts_dir: Optional[Path] = Field(default=None, description="scripts 目录路径")
-    references_dir: Optional[Path] = Field(default=None, description="references 目录路径")
-    assets_dir: Optional[Path] = Field(default=None, description="assets 目录路径")
+    scripts_dir: Optional[Path]                 # scripts 目录路径
+    references_dir: Optional[Path]              # references 目录路径
+    assets_dir: Optional[Path]                  # assets 目录路径
+    skill_md_path: Optional[Path]               # 用于延迟读取正文的 SKILL.md 路径
+    _body_ref: Optional[Tuple[int, int, int]] = field(repr=False, compare=False)
+    _instructions: Optional[str] = field(repr=False, compare=False)
     
-    class Config:
-        arbitrary_types_allowed = True
+    def __init__(
+        self,
+        metadata: SkillMetadata,
+        instructions: Optional[str] = None,
+        scripts_dir: Optional[Path] = None,
+        references_dir: Optional[Path] = None,
+        assets_dir: Optional[Path] = None,
+        skill_md_path: Optional[Path] = None,
+        body_ref: Optional[Tuple[int, int, int]] = None,
+    ):
+        # 冻结的 dataclass 只能通过 object.__setattr__ 初始化字段
+        object.__setattr__(self, "metadata", metadata)
+        object.__setattr__(self, "scripts_dir", scripts_dir)
+        object.__setattr__(self, "references_dir", references_dir)
+        object.__setattr__(self, "assets_dir", assets_dir)
+        object.__setattr__(self, "skill_md_path", skill_md_path)
+        # 发现阶段记录的 (mtime, 大小, 正文字节偏移)，读取正文时免去再次查找 frontmatter
+        object.__setattr__(self, "_body_ref", body_ref)
+        object.__setattr__(self, "_instructions", instructions)
+    
+    @property
+    def instructions(self) -> str:
+        """完整的 SKILL.md 正文内容（frontmatter 之后的部分）。"""
+        if self._instructions is None:
+            body = _read_body(self.skill_md_path, self._body_ref) if self.skill_md_path else None
+            object.__setattr__(self, "_instructions", body.strip() if body else "")
+        return self._instructions
+    
+    def instructions_preview(self, length: int = 500) -> str:
+        """
+        返回指令正文的前 length 个字符，结果与 instructions[:length] 相同。
+        
+        正文尚未加载时只读取并解码文件开头的一部分，不会加载完整正文。
+        
+        参数:
+            length: 预览的字符数
+            
+        返回:
+            指令正文的开头部分
+        """
+        if self._instructions is None and self.skill_md_path:
+            # UTF-8 字符最多 4 字节，另外预留开头空白的余量
+            body = _read_body(self.skill_md_path, self._body_ref, limit=4 * length + 1024)
+            text = body.lstrip() if body else ""
+            # 预览之后还有非空白字符时，完整正文末尾的 strip 不会影响预览部分
+            if text[length:].strip():
+                return text[:length]
+        return self.instructions[:length]
 
 
 class SkillLoader:
     """从文件系统加载和管理 Agent Skills。"""
     
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = None):
+        """
+        初始化 SkillLoader。
+        
+        参数:
+            cache_path: 解析后的 frontmatter 的磁盘缓存文件（例如
+                ~/.cache/agno_skills/metadata.json），进程重启后未修改的 SKILL.md
+                无需重新解析；默认为 None，不读写磁盘缓存
+        """
         self._metadata_cache: Dict[str, SkillMetadata] = {}
-        self._content_cache: Dict[str, SkillContent] = {}
+        # skill 名称 -> (SKILL.md 的 mtime, 内容)，文件修改后在下次读取时自动失效
+        self._content_cache: Dict[str, Tuple[int, SkillContent]] = {}
+        # 目录 -> (mtime, ((名称, 是否为目录), ...))，目录内容变化时 mtime 随之改变
+        self._dir_cache: Dict[str, Tuple[int, Tuple[Tuple[str, bool], ...]]] = {}
+        # SKILL.md 路径 -> (mtime, 大小, 正文字节偏移)，由发现阶段记录，激活时复用
+        self._body_offsets: Dict[str, Tuple[int, int, int]] = {}
+        # SKILL.md 绝对路径 -> (mtime, 大小, 正文字节偏移, frontmatter 部分的摘要, 解析后的 frontmatter)
+        self._cache_path = cache_path
+        self._disk_cache: Dict[str, Tuple[int, int, int, str, Dict[str, Any]]] = self._load_disk_cache()
+    
+    def _load_disk_cache(self) -> Dict[str, Tuple[int, int, int, str, Dict[str, Any]]]:
+        """
+        从磁盘加载 frontmatter 缓存，未启用、文件不存在或损坏时返回空字典。
+        
+        任一条目的结构或字段类型不符（例如旧版本写入的格式）时整个文件视为无效，
+        下次写入时被覆盖。
+        """
+        if self._cache_path is None:
+            return {}
+        try:
+            with open(self._cache_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            cache = {}
+            for path, mtime, size, offset, digest, data in entries:
+                if not (
+                    isinstance(path, str)
+                    and all(type(value) is int for value in (mtime, size, offset))
+                    and isinstance(digest, str)
+                    and isinstance(data, dict)
+                ):
+                    return {}
+                cache[path] = (mtime, size, offset, digest, data)
+            return cache
+        except (OSError, ValueError, TypeError):
+            return {}
+    
+    def _save_disk_cache(self):
+        """将 frontmatter 缓存原子地写入磁盘，写入失败时忽略。"""
+        if self._cache_path is None:
+            return
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    [[path, *entry] for path, entry in self._disk_cache.items()],
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass
+    
+    def _scan(self, directory: Path) -> Tuple[Tuple[str, bool], ...]:
+        """
+        列出目录的直接子项，按目录 mtime 缓存。
+        
+        命中时只需一次 stat，未命中时用一次 os.scandir 取得所有子项及其类型。
+        
+        参数:
+            directory: 目录路径
+            
+        返回:
+            (名称, 是否为目录) 元组
+        """
+        key = str(directory)
+        mtime = os.stat(key).st_mtime_ns
+        cached = self._dir_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        with os.scandir(key) as it:
+            entries = tuple((entry.name, entry.is_dir()) for entry in it)
+        self._dir_cache[key] = (mtime, entries)
+        return entries
     
     def discover_skills(self, skills_dir: Path) -> Dict[str, SkillMetadata]:
         """
@@ -53,6 +359,7 @@ class SkillLoader:
         
         扫描包含 SKILL.md 文件的目录并加载其元数据。
         实现渐进式披露 - 只加载 frontmatter，不加载完整内容。
+        skill 较多时在线程池中并发读取，使各目录的 I/O 等待相互重叠。
         
         参数:
             skills_dir: 包含 skill 文件夹的目录路径
@@ -60,37 +367,208 @@ class SkillLoader:
         返回:
             将 skill 名称映射到其元数据的字典
         """
+        skill_paths = self._list_skill_dirs(skills_dir)
+        
+        if len(skill_paths) < 3:
+            results = [self._read_candidate(skill_path) for skill_path in skill_paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(32, len(skill_paths))) as pool:
+                results = list(pool.map(self._read_candidate, skill_paths))
+        
+        return self._collect_metadata(skill_paths, results)
+    
+    async def discover_skills_async(self, skills_dir: Path, max_concurrency: int = 256) -> Dict[str, SkillMetadata]:
+        """
+        discover_skills 的异步版本。
+        
+        每个 skill 目录的读取作为一个任务并发执行，由信号量限制同时打开的
+        文件数，适合高延迟的网络文件系统；等待期间不阻塞事件循环。
+        
+        参数:
+            skills_dir: 包含 skill 文件夹的目录路径
+            max_concurrency: 同时进行的读取数上限
+            
+        返回:
+            将 skill 名称映射到其元数据的字典
+        """
+        skill_paths = await asyncio.to_thread(self._list_skill_dirs, skills_dir)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def read_one(skill_path: Path) -> Any:
+            async with semaphore:
+                return await asyncio.to_thread(self._read_candidate, skill_path)
+        
+        results = await asyncio.gather(*(read_one(skill_path) for skill_path in skill_paths))
+        return self._collect_metadata(skill_paths, results)
+    
+    def _list_skill_dirs(self, skills_dir: Path) -> List[Path]:
+        """
+        列出 skills 目录下的所有子目录，按名称排序。
+        
+        os.scandir 的顺序取决于文件系统，排序后发现结果和由此生成的 agent
+        指令在不同进程和机器上逐字节一致，模型服务端的前缀缓存可以命中。
+        """
         skills_dir = Path(skills_dir)
-        if not skills_dir.exists():
+        try:
+            entries = self._scan(skills_dir)
+        except FileNotFoundError:
             raise ValueError(f"Skills directory does not exist: {skills_dir}")
         
-        discovered_skills = {}
+        return [skills_dir / name for name, is_dir in sorted(entries) if is_dir]
+    
+    def _read_candidate(self, skill_path: Path) -> Any:
+        """
+        读取候选 skill 目录中 SKILL.md 的 frontmatter。
         
-        # 扫描 skill 目录
-        for skill_path in skills_dir.iterdir():
-            if not skill_path.is_dir():
-                continue
+        启用磁盘缓存且文件自上次解析后未被修改时，直接使用缓存中的解析结果。
+        
+        返回:
+            frontmatter 文本或已解析的 _ParsedFrontmatter；不是 skill 目录时返回 None，
+            读取失败时返回异常对象
+        """
+        try:
+            if ("SKILL.md", False) not in self._scan(skill_path):
+                return None
+            skill_md_path = skill_path / "SKILL.md"
+            if self._cache_path is not None:
+                parsed = self._cached_frontmatter(skill_md_path)
+                if parsed is not None:
+                    return parsed
+            return self._read_skill_frontmatter(skill_md_path)
+        except Exception as e:
+            return e
+    
+    def _cached_frontmatter(self, skill_md_path: Path) -> Optional[_ParsedFrontmatter]:
+        """
+        从磁盘缓存取得 SKILL.md 已解析的 frontmatter。
+        
+        mtime 和大小一致后，再比较正文偏移之前部分的摘要：只有这部分内容
+        与解析时相同，缓存的解析结果和正文偏移才适用于当前文件。
+        
+        参数:
+            skill_md_path: SKILL.md 文件路径
             
-            skill_md = skill_path / "SKILL.md"
-            if not skill_md.exists():
-                continue
+        返回:
+            已解析的 frontmatter；没有缓存或缓存已失效时返回 None
+        """
+        cached = self._disk_cache.get(_cache_key(skill_md_path))
+        if cached is None:
+            return None
+        mtime, size, offset, digest, data = cached
+        with open(skill_md_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_mtime_ns != mtime or st.st_size != size:
+                return None
+            if _frontmatter_digest(f.read(offset)) != digest:
+                return None
+        self._body_offsets[str(skill_md_path)] = (mtime, size, offset)
+        return _ParsedFrontmatter(data)
+    
+    def _collect_metadata(self, skill_paths: List[Path], results: List[Any]) -> Dict[str, SkillMetadata]:
+        """
+        解析读取到的 frontmatter，按目录顺序合并结果并更新缓存。
+        
+        参数:
+            skill_paths: 候选 skill 目录
+            results: 与 skill_paths 对应的 _read_candidate 结果
             
+        返回:
+            将 skill 名称映射到其元数据的字典
+        """
+        # 所有 frontmatter 一次性解析
+        skills = [(path, text) for path, text in zip(skill_paths, results) if isinstance(text, str)]
+        documents = iter(_load_yaml_documents([text for _, text in skills]))
+        
+        discovered_skills = {}
+        cache_changed = False
+        for skill_path, result in zip(skill_paths, results):
+            if result is None:
+                continue
             try:
-                metadata = self._load_metadata(skill_path, skill_md)
-                discovered_skills[metadata.name] = metadata
-                self._metadata_cache[metadata.name] = metadata
+                if isinstance(result, Exception):
+                    raise result
+                if isinstance(result, _ParsedFrontmatter):
+                    data = result.data
+                else:
+                    data = next(documents)
+                    if isinstance(data, yaml.YAMLError):
+                        raise ValueError(f"Invalid YAML in {skill_path / 'SKILL.md'}: {data}")
+                    cache_changed |= self._remember_frontmatter(skill_path / "SKILL.md", data)
+                metadata = self._build_metadata(skill_path, skill_path / "SKILL.md", data)
             except Exception as e:
                 print(f"Warning: Failed to load skill from {skill_path}: {e}")
                 continue
+            discovered_skills[metadata.name] = metadata
+            self._metadata_cache[metadata.name] = metadata
+        
+        # 移除该 skills 目录下已不存在的条目
+        if skill_paths and self._cache_path is not None:
+            prefix = str(skill_paths[0].parent.resolve()) + os.sep
+            present = {_cache_key(skill_path / "SKILL.md") for skill_path in skill_paths}
+            for path in [path for path in self._disk_cache if path.startswith(prefix) and path not in present]:
+                del self._disk_cache[path]
+                cache_changed = True
+        
+        if cache_changed:
+            self._save_disk_cache()
         
         return discovered_skills
     
+    def _remember_frontmatter(self, skill_md_path: Path, data: Any) -> bool:
+        """
+        将新解析的 frontmatter 记入磁盘缓存。
+        
+        只缓存经 JSON 往返后保持不变的结果（例如 YAML 日期或非字符串键不会被缓存）。
+        读取摘要时文件已被修改的，不写入缓存。
+        
+        参数:
+            skill_md_path: SKILL.md 文件路径
+            data: 解析后的 frontmatter
+            
+        返回:
+            缓存是否发生变化
+        """
+        body_ref = self._body_offsets.get(str(skill_md_path))
+        if self._cache_path is None or body_ref is None or not isinstance(data, dict):
+            return False
+        try:
+            if json.loads(json.dumps(data)) != data:
+                return False
+            with open(skill_md_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                if (st.st_mtime_ns, st.st_size) != body_ref[:2]:
+                    return False
+                digest = _frontmatter_digest(f.read(body_ref[2]))
+        except (TypeError, ValueError, OSError):
+            return False
+        self._disk_cache[_cache_key(skill_md_path)] = (*body_ref, digest, data)
+        return True
+    
+    def _read_skill_frontmatter(self, skill_md_path: Path) -> str:
+        """
+        读取 SKILL.md 的 frontmatter 文本，并记录正文位置供激活时复用。
+        
+        参数:
+            skill_md_path: SKILL.md 文件路径
+            
+        返回:
+            frontmatter 文本
+        """
+        result = _read_frontmatter(skill_md_path)
+        if not result or not result[0]:
+            raise ValueError(f"No valid YAML frontmatter found in {skill_md_path}")
+        
+        # 记录正文位置，激活时无需再次查找 frontmatter
+        self._body_offsets[str(skill_md_path)] = (result[2], result[3], result[1])
+        return result[0]
+    
     def _load_metadata(self, skill_path: Path, skill_md_path: Path) -> SkillMetadata:
         """
         从 SKILL.md frontmatter 加载元数据。
         
         只解析 YAML frontmatter，不加载完整的 Markdown 正文。
-        这在 skill 发现期间保持最小的上下文使用。
+        这在 skill 发现期间保持最小的上下文使用；文件通过内存映射
+        读取，正文部分不会被解码。
         
         参数:
             skill_path: skill 目录路径
@@ -99,26 +577,38 @@ class SkillLoader:
         返回:
             SkillMetadata 对象
         """
-        with open(skill_md_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
         # 提取 YAML frontmatter
-        frontmatter = self._extract_frontmatter(content)
-        if not frontmatter:
-            raise ValueError(f"No valid YAML frontmatter found in {skill_md_path}")
+        frontmatter = self._read_skill_frontmatter(skill_md_path)
         
         # 解析 YAML
         try:
-            data = yaml.safe_load(frontmatter)
+            data = yaml.load(frontmatter, Loader=_YamlLoader)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML in {skill_md_path}: {e}")
         
+        return self._build_metadata(skill_path, skill_md_path, data)
+    
+    def _build_metadata(self, skill_path: Path, skill_md_path: Path, data: Dict[str, Any]) -> SkillMetadata:
+        """
+        校验解析后的 frontmatter 并创建元数据对象。
+        
+        参数:
+            skill_path: skill 目录路径
+            skill_md_path: SKILL.md 文件路径（用于错误信息）
+            data: 解析后的 frontmatter
+            
+        返回:
+            SkillMetadata 对象
+        """
         # 验证必需字段
         if "name" not in data:
             raise ValueError(f"Missing required 'name' field in {skill_md_path}")
         if "description" not in data:
             raise ValueError(f"Missing required 'description' field in {skill_md_path}")
         
+        # 可选资源目录在发现时确定一次（目录扫描已缓存），激活时直接使用
+        subdirs = {name for name, is_dir in self._scan(skill_path) if is_dir}
+        
         # 创建元数据对象
         return SkillMetadata(
             name=data["name"],
@@ -127,6 +617,9 @@ class SkillLoader:
             license=data.get("license"),
             compatibility=data.get("compatibility"),
             metadata=data.get("metadata"),
+            scripts_dir=skill_path / "scripts" if "scripts" in subdirs else None,
+            references_dir=skill_path / "references" if "references" in subdirs else None,
+            assets_dir=skill_path / "assets" if "assets" in subdirs else None,
         )
     
     def _extract_frontmatter(self, content: str) -> Optional[str]:
@@ -141,10 +634,9 @@ class SkillLoader:
         返回:
             YAML frontmatter 字符串，如果未找到则返回 None
         """
-        pattern = r"^---\s*\n(.*?)\n---\s*\n"
-        match = re.match(pattern, content, re.DOTALL)
-        if match:
-            return match.group(1)
+        bounds = _frontmatter_bounds(content)
+        if bounds:
+            return content[bounds[0]:bounds[1]]
         return None
     
     def load_full_skill(self, skill_name: str) -> SkillContent:
@@ -152,7 +644,8 @@ class SkillLoader:
         加载包含指令的完整 skill 内容。
         
         当 skill 被激活并需要完整上下文时调用此方法。
-        实现渐进式披露的第二阶段。
+        实现渐进式披露的第二阶段。缓存按 SKILL.md 的修改时间校验，
+        文件被编辑后重新加载，无需 clear_cache()。
         
         参数:
             skill_name: 要加载的 skill 名称
@@ -160,43 +653,32 @@ class SkillLoader:
         返回:
             包含完整指令的 SkillContent 对象
         """
-        # 首先检查缓存
-        if skill_name in self._content_cache:
-            return self._content_cache[skill_name]
-        
         # 获取元数据
-        if skill_name not in self._metadata_cache:
+        metadata = self._metadata_cache.get(skill_name)
+        if metadata is None:
             raise ValueError(f"Skill not found: {skill_name}")
         
-        metadata = self._metadata_cache[skill_name]
         skill_md_path = metadata.path / "SKILL.md"
         
-        # 加载完整内容
-        with open(skill_md_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 提取指令（frontmatter 之后的所有内容）
-        frontmatter_end = content.find("---\n", 4)  # 找到第二个 ---
-        if frontmatter_end == -1:
-            instructions = ""
-        else:
-            instructions = content[frontmatter_end + 4:].strip()
-        
-        # 检查可选目录
-        scripts_dir = metadata.path / "scripts"
-        references_dir = metadata.path / "references"
-        assets_dir = metadata.path / "assets"
+        # 首先检查缓存，一次 stat 校验内容是否仍然有效
+        mtime = os.stat(skill_md_path).st_mtime_ns
+        cached = self._content_cache.get(skill_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
         
+        # 指令（frontmatter 之后的所有内容）在首次访问时才读取；
+        # 可选目录已在发现时确定，无需再次访问文件系统
         skill_content = SkillContent(
             metadata=metadata,
-            instructions=instructions,
-            scripts_dir=scripts_dir if scripts_dir.exists() else None,
-            references_dir=references_dir if references_dir.exists() else None,
-            assets_dir=assets_dir if assets_dir.exists() else None,
+            scripts_dir=metadata.scripts_dir,
+            references_dir=metadata.references_dir,
+            assets_dir=metadata.assets_dir,
+            skill_md_path=skill_md_path,
+            body_ref=self._body_offsets.get(str(skill_md_path)),
         )
         
         # 缓存结果
-        self._content_cache[skill_name] = skill_content
+        self._content_cache[skill_name] = (mtime, skill_content)
         
         return skill_content
     
@@ -212,3 +694,5 @@ class SkillLoader:
         """清除所有缓存。"""
         self._metadata_cache.clear()
         self._content_cache.clear()
+        self._dir_cache.clear()
+        self._body_offsets.clear()
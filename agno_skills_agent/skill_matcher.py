@@ -4,15 +4,175 @@ Skill Matcher - 智能地将用户请求匹配到合适的 skills。
 使用基于 LLM 的匹配来为给定任务选择最相关的 skill(s)。
 """
 
-from typing import Dict, List, Optional
+import re
+import sys
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from .skill_loader import SkillMetadata
 
 
+# 常见动作词：查询和描述都包含同一组中的词时加分
+_ACTION_WORDS: Dict[str, Tuple[str, ...]] = {
+    "create": ("creating", "create", "build", "generate"),
+    "test": ("test", "testing", "verify", "check"),
+    "analyze": ("analyze", "analysis", "examine"),
+    "process": ("process", "processing", "handle"),
+    "extract": ("extract", "extraction", "parse"),
+    "convert": ("convert", "conversion", "transform"),
+    "edit": ("edit", "editing", "modify", "update"),
+    "search": ("search", "find", "look"),
+    "design": ("design", "designing", "layout"),
+}
+
+# 特定 skill 的指示词：查询和 skill 名称或描述都包含同一组中的词时加分
+_SKILL_INDICATORS: Dict[str, Tuple[str, ...]] = {
+    "mcp": ("mcp", "model context protocol", "mcp server"),
+    "pdf": ("pdf", "document"),
+    "excel": ("excel", "xlsx", "spreadsheet"),
+    "powerpoint": ("powerpoint", "pptx", "presentation", "slides"),
+    "word": ("word", "docx", "document"),
+    "web": ("web", "webapp", "website", "browser", "localhost"),
+    "skill": ("skill", "create skill", "new skill"),
+    "test": ("test", "testing", "playwright"),
+    "brand": ("brand", "branding", "guidelines"),
+    "design": ("design", "ui", "frontend"),
+    "art": ("art", "artistic", "generative"),
+    "gif": ("gif", "animation"),
+    "slack": ("slack",),
+}
+
+
+# 分词：连续的字母数字（含非 ASCII 文字）为一个词，标点和连字符不属于词
+_WORD_RE = re.compile(r"\w+")
+
+
+def _matching_keys(text: str, groups: Dict[str, Tuple[str, ...]]) -> FrozenSet[str]:
+    """返回 groups 中至少有一个词出现在 text 中的分组键。"""
+    return frozenset(key for key, variants in groups.items() if any(variant in text for variant in variants))
+
+
+def _same_skills(cached_skills: Dict[str, SkillMetadata], cached_names: FrozenSet[str], skills: Dict[str, SkillMetadata]) -> bool:
+    """
+    检查缓存时的 skills 字典是否仍是同一个对象且 skill 名称集合未变。
+    
+    就地删除一个 skill 再添加另一个后，字典对象和数量都不变，因此比较名称集合
+    （keys 视图与 frozenset 比较，不创建新集合）。同名 skill 的元数据被就地
+    替换时无法检测，需要调用 SkillMatcher.bump_version()。
+    """
+    return cached_skills is skills and skills.keys() == cached_names
+
+
+def _format_skill_block(metadata: SkillMetadata) -> str:
+    """格式化单个 skill 在提示中的 XML 块（含其后的空行）。"""
+    license_line = f"  <license>{metadata.license}</license>\n" if metadata.license else ""
+    return (
+        f"<skill>\n"
+        f"  <name>{metadata.name}</name>\n"
+        f"  <description>{metadata.description}</description>\n"
+        f"{license_line}"
+        f"</skill>\n\n"
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class _SkillIndex:
+    """skill 上与查询无关的匹配特征，skills 重新加载前保持不变。"""
+    metadata: SkillMetadata
+    name_lower: str
+    desc_words: FrozenSet[str]
+    action_hits: FrozenSet[str]                  # 描述命中的动作词分组
+    indicator_hits: FrozenSet[str]               # 名称或描述命中的指示词分组
+    
+    @classmethod
+    def build(cls, metadata: SkillMetadata) -> "_SkillIndex":
+        name_lower = metadata.name.lower()
+        desc_lower = metadata.description.lower()
+        indicator_hits = _matching_keys(name_lower, _SKILL_INDICATORS) | _matching_keys(desc_lower, _SKILL_INDICATORS)
+        return cls(
+            metadata=metadata,
+            name_lower=name_lower,
+            # 驻留描述词，各 skill 共用同一词表中的字符串对象
+            desc_words=frozenset(map(sys.intern, _WORD_RE.findall(desc_lower))),
+            action_hits=_matching_keys(desc_lower, _ACTION_WORDS),
+            indicator_hits=indicator_hits,
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class _SkillCorpus:
+    """
+    一组 skills 的倒排索引。
+    
+    每个描述词、动作词分组和指示词分组映射到具有该特征的 skill 位置，
+    评分时只需遍历查询命中的特征，无需逐个 skill 求交集。
+    """
+    skills: Dict[str, SkillMetadata]             # 建立索引时的 skills 字典
+    name_set: FrozenSet[str]                     # 建立索引时的 skill 名称集合
+    names: Tuple[str, ...]
+    names_lower: Tuple[str, ...]
+    word_index: Dict[str, List[int]]
+    action_index: Dict[str, List[int]]
+    indicator_index: Dict[str, List[int]]
+    
+    @classmethod
+    def build(cls, skills: Dict[str, SkillMetadata], indexes: List[_SkillIndex]) -> "_SkillCorpus":
+        word_index: Dict[str, List[int]] = {}
+        action_index: Dict[str, List[int]] = {}
+        indicator_index: Dict[str, List[int]] = {}
+        for position, index in enumerate(indexes):
+            for word in index.desc_words:
+                word_index.setdefault(word, []).append(position)
+            for key in index.action_hits:
+                action_index.setdefault(key, []).append(position)
+            for key in index.indicator_hits:
+                indicator_index.setdefault(key, []).append(position)
+        return cls(
+            skills=skills,
+            name_set=frozenset(skills),
+            names=tuple(skills),
+            names_lower=tuple(index.name_lower for index in indexes),
+            word_index=word_index,
+            action_index=action_index,
+            indicator_index=indicator_index,
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class _QueryFeatures:
+    """查询的匹配特征，每次匹配只计算一次。"""
+    text: str
+    words: FrozenSet[str]
+    action_keys: FrozenSet[str]
+    indicator_keys: FrozenSet[str]
+    
+    @classmethod
+    def build(cls, query_lower: str) -> "_QueryFeatures":
+        return cls(
+            text=query_lower,
+            words=frozenset(_WORD_RE.findall(query_lower)),
+            action_keys=_matching_keys(query_lower, _ACTION_WORDS),
+            indicator_keys=_matching_keys(query_lower, _SKILL_INDICATORS),
+        )
+
+
 class SkillMatcher:
     """基于描述将用户查询匹配到相关的 skills。"""
     
-    def __init__(self):
-        self._match_cache: Dict[str, List[str]] = {}
+    def __init__(self, cache_maxsize: int = 256):
+        # (小写查询, id(skills), top_k, skills 版本) -> 匹配结果，按 LRU 淘汰
+        self._match_cache: "OrderedDict[Tuple[str, int, int, int], List[str]]" = OrderedDict()
+        self._cache_maxsize = cache_maxsize
+        self._skills_version = 0
+        # skill 名称 -> 预处理索引，首次匹配时构建
+        self._index: Dict[str, _SkillIndex] = {}
+        # 最近一次匹配的 skills 的倒排索引
+        self._corpus: Optional[_SkillCorpus] = None
+        # (skills 版本, skills 字典, skill 名称集合, 提示文本)
+        self._prompt_cache: Optional[Tuple[int, Dict[str, SkillMetadata], FrozenSet[str], str]] = None
+        # (skills 版本, skills 字典, skill 名称集合, 小写名称 -> 名称)
+        self._name_lookup: Optional[Tuple[int, Dict[str, SkillMetadata], FrozenSet[str], Dict[str, str]]] = None
     
     def match_skills(
         self,
@@ -37,95 +197,97 @@ class SkillMatcher:
         if not skills:
             return []
         
-        # 计算相关性分数
-        scores = {}
         query_lower = user_query.lower()
+        corpus = self._get_corpus(skills)
+        
+        # 相同查询直接返回缓存结果，跳过全部评分
+        key = (query_lower, id(skills), top_k, self._skills_version)
+        cached = self._match_cache.get(key)
+        if cached is not None:
+            self._match_cache.move_to_end(key)
+            return list(cached)
         
-        for skill_name, metadata in skills.items():
-            score = self._calculate_relevance(query_lower, metadata)
-            scores[skill_name] = score
+        # 计算相关性分数，查询特征只提取一次
+        scores = self._calculate_relevance(_QueryFeatures.build(query_lower), corpus)
         
-        # 按分数排序并返回前 k 个
-        sorted_skills = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        # 部分选择分数最高的前 k 个（O(N log k)），同分时保持 skills 中的顺序
+        ranked = heapq.nsmallest(top_k, scores, key=lambda position: (-scores[position], position))
+        relevant_skills = [corpus.names[position] for position in ranked]
         
-        # 过滤掉零分的 skills
-        relevant_skills = [name for name, score in sorted_skills if score > 0]
+        self._match_cache[key] = relevant_skills
+        if len(self._match_cache) > self._cache_maxsize:
+            self._match_cache.popitem(last=False)
         
-        return relevant_skills[:top_k]
+        return list(relevant_skills)
     
-    def _calculate_relevance(self, query: str, metadata: SkillMetadata) -> float:
+    def _calculate_relevance(self, query: _QueryFeatures, corpus: _SkillCorpus) -> Dict[int, float]:
         """
-        计算查询和 skill 之间的相关性分数。
+        计算查询和每个 skill 之间的相关性分数。
         
         使用简单的关键词匹配和描述分析。
         后续可以添加更复杂的方法（embeddings）。
         
         参数:
-            query: 小写的用户查询
-            metadata: Skill 元数据
+            query: 预处理后的查询特征
+            corpus: skills 的倒排索引
             
         返回:
-            相关性分数（越高越相关）
+            skill 位置到相关性分数的字典（越高越相关），只包含分数大于零的 skill
         """
-        score = 0.0
+        scores: Dict[int, float] = {}
         
         # 检查 skill 名称是否出现在查询中
-        skill_name_lower = metadata.name.lower()
-        if skill_name_lower in query:
-            score += 10.0
-        
-        # 检查描述关键词
-        description_lower = metadata.description.lower()
-        
-        # 分割为单词进行关键词匹配
-        query_words = set(query.split())
-        description_words = set(description_lower.split())
-        
-        # 计算匹配的关键词
-        matching_words = query_words.intersection(description_words)
-        score += len(matching_words) * 1.0
-        
-        # 匹配常见动作词的加分
-        action_words = {
-            "create": ["creating", "create", "build", "generate"],
-            "test": ["test", "testing", "verify", "check"],
-            "analyze": ["analyze", "analysis", "examine"],
-            "process": ["process", "processing", "handle"],
-            "extract": ["extract", "extraction", "parse"],
-            "convert": ["convert", "conversion", "transform"],
-            "edit": ["edit", "editing", "modify", "update"],
-            "search": ["search", "find", "look"],
-            "design": ["design", "designing", "layout"],
-        }
-        
-        for base_action, variants in action_words.items():
-            if any(variant in query for variant in variants):
-                if any(variant in description_lower for variant in variants):
-                    score += 5.0
-        
-        # 特定 skill 检测
-        skill_indicators = {
-            "mcp": ["mcp", "model context protocol", "mcp server"],
-            "pdf": ["pdf", "document"],
-            "excel": ["excel", "xlsx", "spreadsheet"],
-            "powerpoint": ["powerpoint", "pptx", "presentation", "slides"],
-            "word": ["word", "docx", "document"],
-            "web": ["web", "webapp", "website", "browser", "localhost"],
-            "skill": ["skill", "create skill", "new skill"],
-            "test": ["test", "testing", "playwright"],
-            "brand": ["brand", "branding", "guidelines"],
-            "design": ["design", "ui", "frontend"],
-            "art": ["art", "artistic", "generative"],
-            "gif": ["gif", "animation"],
-            "slack": ["slack"],
-        }
-        
-        for indicator_key, indicators in skill_indicators.items():
-            if any(ind in query for ind in indicators):
-                if any(ind in skill_name_lower or ind in description_lower for ind in indicators):
-                    score += 8.0
-        
-        return score
+        for position, name_lower in enumerate(corpus.names_lower):
+            if name_lower in query.text:
+                scores[position] = 10.0
+        
+        # 匹配的关键词每个加 1 分，常见动作词每组加 5 分，特定 skill 指示词每组加 8 分
+        for features, feature_index, weight in (
+            (query.words, corpus.word_index, 1.0),
+            (query.action_keys, corpus.action_index, 5.0),
+            (query.indicator_keys, corpus.indicator_index, 8.0),
+        ):
+            for feature in features:
+                for position in feature_index.get(feature, ()):
+                    scores[position] = scores.get(position, 0.0) + weight
+        
+        return scores
+    
+    def _get_corpus(self, skills: Dict[str, SkillMetadata]) -> _SkillCorpus:
+        """
+        返回 skills 的倒排索引，skills 字典或其中的 skill 名称变化时重新构建。
+        
+        重新构建时同时清空匹配缓存：缓存只保留当前 skills 字典的结果，
+        而该字典由索引持有引用，不会被回收后以相同 id 复用。
+        
+        参数:
+            skills: 可用 skills 的字典
+            
+        返回:
+            倒排索引
+        """
+        corpus = self._corpus
+        if corpus is None or not _same_skills(corpus.skills, corpus.name_set, skills):
+            corpus = _SkillCorpus.build(skills, [self._get_index(metadata) for metadata in skills.values()])
+            self._corpus = corpus
+            self._match_cache.clear()
+        return corpus
+    
+    def _get_index(self, metadata: SkillMetadata) -> _SkillIndex:
+        """
+        返回 skill 的预处理索引，首次使用或元数据对象变化时重新构建。
+        
+        参数:
+            metadata: Skill 元数据
+            
+        返回:
+            skill 索引
+        """
+        index = self._index.get(metadata.name)
+        if index is None or index.metadata is not metadata:
+            index = _SkillIndex.build(metadata)
+            self._index[metadata.name] = index
+        return index
     
     def format_skills_for_prompt(self, skills: Dict[str, SkillMetadata]) -> str:
         """
@@ -143,22 +305,20 @@ class SkillMatcher:
         if not skills:
             return "<available_skills>\nNo skills available.\n</available_skills>"
         
-        lines = ["<available_skills>"]
-        lines.append("The following skills are available. To use a skill, call the activate_skill tool with the skill name.")
-        lines.append("")
-        
-        for skill_name, metadata in skills.items():
-            lines.append(f"<skill>")
-            lines.append(f"  <name>{metadata.name}</name>")
-            lines.append(f"  <description>{metadata.description}</description>")
-            if metadata.license:
-                lines.append(f"  <license>{metadata.license}</license>")
-            lines.append(f"</skill>")
-            lines.append("")
+        # 同一 skills 字典在版本不变时输出相同，直接复用上次的结果
+        cached = self._prompt_cache
+        if cached is not None and cached[0] == self._skills_version and _same_skills(cached[1], cached[2], skills):
+            return cached[3]
         
-        lines.append("</available_skills>")
+        prompt = "".join((
+            "<available_skills>\n"
+            "The following skills are available. To use a skill, call the activate_skill tool with the skill name.\n\n",
+            *map(_format_skill_block, skills.values()),
+            "</available_skills>",
+        ))
         
-        return "\n".join(lines)
+        self._prompt_cache = (self._skills_version, skills, frozenset(skills), prompt)
+        return prompt
     
     def get_skill_summary(self, metadata: SkillMetadata) -> str:
         """
@@ -187,14 +347,36 @@ class SkillMatcher:
         返回:
             如果找到返回精确的 skill 名称，否则返回 None
         """
-        skill_name_lower = skill_name.lower()
+        # 小写名称到名称的映射按 skills 字典缓存，每次查找只需一次字典访问
+        cached = self._name_lookup
+        if cached is None or cached[0] != self._skills_version or not _same_skills(cached[1], cached[2], skills):
+            lookup: Dict[str, str] = {}
+            for name in skills:
+                # 大小写不同的重名时与逐个比较一样返回第一个
+                lookup.setdefault(name.lower(), name)
+            cached = (self._skills_version, skills, frozenset(skills), lookup)
+            self._name_lookup = cached
         
-        for name in skills.keys():
-            if name.lower() == skill_name_lower:
-                return name
+        return cached[3].get(skill_name.lower())
+    
+    def bump_version(self):
+        """
+        标记 skills 已变化，使之前的匹配结果失效。
         
-        return None
+        skills 重新加载后应调用此方法。在同一字典中增删 skill 会被自动检测，
+        但就地替换同名 skill 的元数据后必须调用此方法。
+        """
+        self._skills_version += 1
+        self._match_cache.clear()
+        self._index.clear()
+        self._corpus = None
+        self._prompt_cache = None
+        self._name_lookup = None
     
     def clear_cache(self):
         """清除匹配缓存。"""
         self._match_cache.clear()
+        self._index.clear()
+        self._corpus = None
+        self._prompt_cache = None
+        self._name_lookup = None
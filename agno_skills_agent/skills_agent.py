@@ -6,9 +6,7 @@ agent，可以基于用户请求动态发现和使用 skills。
 """
 
 from pathlib import Path
-from typing import Optional, Dict, Any
-from agno.agent import Agent
-from agno.models.dashscope import DashScope
+from typing import Optional, Dict, Any, Set, Tuple
 
 from .skill_loader import SkillLoader, SkillMetadata, SkillContent
 from .skill_executor import SkillExecutor
@@ -25,12 +23,33 @@ class SkillsAgent:
     3. 动态添加 skill 工具到 agent
     """
     
+    # agent 指令中 skills 列表前后的固定部分
+    _INSTRUCTIONS_PREFIX = """You are an intelligent agent with access to specialized skills.
+
+Skills are modular capabilities that provide specialized knowledge, workflows, and tools.
+You can activate skills when needed to help users accomplish tasks.
+
+"""
+    _INSTRUCTIONS_SUFFIX = """
+
+When a user's request matches a skill's description:
+1. Call activate_skill with the skill name
+2. Use the newly available tools from that skill
+3. Follow the skill's instructions to complete the task
+
+You can activate multiple skills if needed for complex tasks.
+"""
+
     def __init__(
         self,
         skills_dir: str | Path,
         model_id: str = "qwen-plus",
         api_key: Optional[str] = None,
-        debug: bool = False
+        debug: bool = False,
+        prewarm: bool = False,
+        trusted_scripts: bool = False,
+        skill_loader: Optional[SkillLoader] = None,
+        preloaded_skills: Optional[Dict[str, SkillMetadata]] = None
     ):
         """
         初始化 Skills Agent。
@@ -40,24 +59,48 @@ class SkillsAgent:
             model_id: 要使用的 DashScope 模型 ID
             api_key: DashScope API 密钥（可选，未提供时使用环境变量）
             debug: 启用调试模式
+            prewarm: 启动时预先加载所有 skills 的内容并构建工具，
+                     使首次激活与后续激活一样快（会增加启动时间）
+            trusted_scripts: 信任 skill 脚本，脚本直接在当前进程中运行，不经过进程池
+            skill_loader: 使用已有的 SkillLoader（可选），与其他组件共享缓存
+            preloaded_skills: skill_loader 已对 skills_dir 发现的元数据（可选），
+                              提供时跳过启动时的发现
+                              
+        异常:
+            ValueError: 提供了 preloaded_skills 但没有提供 skill_loader
         """
+        if preloaded_skills is not None and skill_loader is None:
+            raise ValueError("preloaded_skills requires the skill_loader that discovered them")
+        
         self.skills_dir = Path(skills_dir)
         self.debug = debug
+        self.prewarm = prewarm
         
         # 初始化组件
-        self.skill_loader = SkillLoader()
-        self.skill_executor = SkillExecutor()
+        self.skill_loader = skill_loader if skill_loader is not None else SkillLoader()
+        self.skill_executor = SkillExecutor(trusted_scripts=trusted_scripts)
         self.skill_matcher = SkillMatcher()
         
         # 发现可用的 skills（仅元数据）
-        print(f"Discovering skills in {self.skills_dir}...")
-        self.skills_metadata = self.skill_loader.discover_skills(self.skills_dir)
+        if preloaded_skills is not None:
+            self.skills_metadata = preloaded_skills
+        else:
+            print(f"Discovering skills in {self.skills_dir}...")
+            self.skills_metadata = self.skill_loader.discover_skills(self.skills_dir)
         print(f"Found {len(self.skills_metadata)} skills")
         
         # 跟踪已激活的 skills
         self.activated_skills: Dict[str, SkillContent] = {}
+        # 已注册到 agent 的 skill 工具名称
+        self._registered_tool_names: Set[str] = set()
+        
+        if self.prewarm:
+            self._prewarm_skills()
+        
+        # 创建基础 Agno agent；agno 在此处才导入，只导入本模块或其他组件时不必加载
+        from agno.agent import Agent
+        from agno.models.dashscope import DashScope
         
-        # 创建基础 Agno agent
         model_kwargs = {
             "id": model_id,
             # 中国大陆用户必须使用此端点
@@ -73,9 +116,28 @@ class SkillsAgent:
             debug_mode=debug,
         )
         
+        self._instructions_signature = self._skills_signature()
+        
         # 添加 skill 管理工具
+        self._build_skill_fragments()
         self._add_skill_management_tools()
     
+    def _prewarm_skills(self):
+        """为所有已发现的 skills 预先构建工具。"""
+        for skill_name in self.skills_metadata:
+            try:
+                skill_content = self.skill_loader.load_full_skill(skill_name)
+                self.skill_executor.prewarm(skill_content)
+            except Exception as e:
+                print(f"Warning: Failed to prewarm skill {skill_name}: {e}")
+    
+    def _skills_signature(self) -> Tuple[Tuple[str, str, Optional[str]], ...]:
+        """返回决定 agent 指令内容的 skill 字段（按发现顺序）。"""
+        return tuple(
+            (metadata.name, metadata.description, metadata.license)
+            for metadata in self.skills_metadata.values()
+        )
+    
     def _build_instructions(self) -> str:
         """
         构建包含可用 skills 元数据的 agent 指令。
@@ -86,26 +148,21 @@ class SkillsAgent:
         返回:
             格式化的指令字符串
         """
-        instructions = """You are an intelligent agent with access to specialized skills.
-
-Skills are modular capabilities that provide specialized knowledge, workflows, and tools.
-You can activate skills when needed to help users accomplish tasks.
-
-"""
-        # 添加可用的 skills 元数据
+        # 添加可用的 skills 元数据，与固定的前后缀一次拼接
         skills_xml = self.skill_matcher.format_skills_for_prompt(self.skills_metadata)
-        instructions += skills_xml
+        return f"{self._INSTRUCTIONS_PREFIX}{skills_xml}{self._INSTRUCTIONS_SUFFIX}"
+    
+    def _build_skill_fragments(self):
+        """
+        预先格式化每个 skill 在 list_skills 和 suggest_skills 输出中的片段。
         
-        instructions += """
-
-When a user's request matches a skill's description:
-1. Call activate_skill with the skill name
-2. Use the newly available tools from that skill
-3. Follow the skill's instructions to complete the task
-
-You can activate multiple skills if needed for complex tasks.
-"""
-        return instructions
+        片段以 (名称行, 描述部分) 存储，list_skills 在两者之间插入激活标记。
+        skills 重新加载后需要重新构建。
+        """
+        self._skill_fragments: Dict[str, Tuple[str, str]] = {
+            name: (f"- **{name}**", f"\n  {metadata.description}\n")
+            for name, metadata in self.skills_metadata.items()
+        }
     
     def _add_skill_management_tools(self):
         """向 agent 添加管理 skills 的工具。"""
@@ -137,14 +194,12 @@ You can activate multiple skills if needed for complex tasks.
             if not self.skills_metadata:
                 return "No skills available."
             
-            result = ["Available Skills:\n"]
-            for name, metadata in self.skills_metadata.items():
-                activated = " [ACTIVATED]" if name in self.activated_skills else ""
-                result.append(f"- **{name}**{activated}")
-                result.append(f"  {metadata.description}")
-                result.append("")
-            
-            return "\n".join(result)
+            # 每个 skill 的片段已预先格式化，调用时只需插入激活标记
+            activated_skills = self.activated_skills
+            return "Available Skills:\n\n" + "\n".join(
+                head + (" [ACTIVATED]" if name in activated_skills else "") + tail
+                for name, (head, tail) in self._skill_fragments.items()
+            )
         
         def get_skill_info(skill_name: str) -> str:
             """
@@ -201,20 +256,14 @@ You can activate multiple skills if needed for complex tasks.
             if not suggestions:
                 return "No relevant skills found for this query."
             
-            result = ["Suggested skills:\n"]
-            for skill_name in suggestions:
-                metadata = self.skills_metadata[skill_name]
-                result.append(f"- **{skill_name}**")
-                result.append(f"  {metadata.description}")
-                result.append("")
-            
-            return "\n".join(result)
+            return "Suggested skills:\n\n" + "\n".join(
+                "".join(self._skill_fragments[skill_name]) for skill_name in suggestions
+            )
         
         # 将工具添加到 agent
-        self.agent.add_tool(activate_skill)
-        self.agent.add_tool(list_skills)
-        self.agent.add_tool(get_skill_info)
-        self.agent.add_tool(suggest_skills)
+        self._management_tools = [activate_skill, list_skills, get_skill_info, suggest_skills]
+        for tool in self._management_tools:
+            self.agent.add_tool(tool)
     
     def activate_skill(self, skill_name: str) -> str:
         """
@@ -252,9 +301,11 @@ You can activate multiple skills if needed for complex tasks.
             # 从 skill 资源创建工具
             tools = self.skill_executor.create_agno_tools(skill_content)
             
-            # 将工具添加到 agent
+            # 将工具添加到 agent；重新激活时跳过已注册的同名工具，避免工具定义重复发送给模型
             for tool in tools:
-                self.agent.add_tool(tool)
+                if tool.__name__ not in self._registered_tool_names:
+                    self.agent.add_tool(tool)
+                    self._registered_tool_names.add(tool.__name__)
             
             # 标记为已激活
             self.activated_skills[actual_name] = skill_content
@@ -268,7 +319,7 @@ You can activate multiple skills if needed for complex tasks.
                 for tool in tools:
                     response.append(f"- {tool.__name__}")
             
-            response.append(f"\n**Instructions:**\n{skill_content.instructions[:500]}...")
+            response.append(f"\n**Instructions:**\n{skill_content.instructions_preview(500)}...")
             
             return "\n".join(response)
             
@@ -310,14 +361,20 @@ You can activate multiple skills if needed for complex tasks.
         """获取当前已激活的 skill 名称列表。"""
         return list(self.activated_skills.keys())
     
-    def clear_activated_skills(self):
+    def clear_activated_skills(self, remove_tools: bool = False):
         """
         清除所有已激活的 skills 及其工具。
         
-        注意：这不会从 agent 中删除工具，
+        注意：默认不会从 agent 中删除工具，
         只是清除激活跟踪。
+        
+        参数:
+            remove_tools: 同时从 agent 中移除 skill 工具，只保留 skill 管理工具
         """
         self.activated_skills.clear()
+        if remove_tools:
+            self.agent.set_tools(self._management_tools)
+            self._registered_tool_names.clear()
     
     def reload_skills(self):
         """
@@ -327,8 +384,16 @@ You can activate multiple skills if needed for complex tasks.
         """
         self.skill_loader.clear_cache()
         self.skills_metadata = self.skill_loader.discover_skills(self.skills_dir)
+        self.skill_matcher.bump_version()
+        self._build_skill_fragments()
+        
+        if self.prewarm:
+            self._prewarm_skills()
         
-        # 更新 agent 指令
-        self.agent.instructions = self._build_instructions()
+        # 指令只包含 skill 的名称、描述和许可证，这些未变化时保留现有指令
+        signature = self._skills_signature()
+        if signature != self._instructions_signature:
+            self.agent.instructions = self._build_instructions()
+            self._instructions_signature = signature
         
         print(f"Reloaded {len(self.skills_metadata)} skills")
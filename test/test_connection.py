@@ -5,13 +5,81 @@ DashScope 连接测试脚本
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 
 # 加载 .env 文件
 load_dotenv()
 
-def test_api_key():
-    """测试 API 密钥配置"""
+# 中国大陆用户必须使用此端点
+BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+
+
+def check_api_key(api_key: str) -> bool:
+    """
+    通过模型列表接口校验 API 密钥，只需一次轻量 HTTP 请求，不调用模型。
+    
+    只有请求成功（2xx）时才认为密钥可用。
+    
+    参数:
+        api_key: DashScope API 密钥
+        
+    返回:
+        密钥是否有效且服务可用
+    """
+    import httpx
+    
+    try:
+        response = httpx.get(
+            f"{BASE_URL}/models",
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=5.0
+        )
+    except httpx.HTTPError as e:
+        print(f"❌ 连接失败")
+        print()
+        print(f"错误信息: {str(e)}")
+        print()
+        print("诊断：网络连接问题")
+        print()
+        print("请检查：")
+        print("  1. 网络连接是否正常")
+        print("  2. 是否可以访问阿里云服务")
+        return False
+    
+    if response.status_code in (401, 403):
+        print(f"❌ API 密钥验证失败（HTTP {response.status_code}）")
+        print()
+        print("诊断：API 密钥无效")
+        print()
+        print("请检查：")
+        print("  1. API 密钥是否正确复制（包括 sk- 前缀）")
+        print("  2. 密钥是否已启用")
+        print("  3. 访问 https://dashscope.console.aliyun.com/ 验证密钥")
+        return False
+    
+    if not response.is_success:
+        # 404 通常是 base_url 错误，429 为限流，5xx 为服务端故障，都无法确认密钥可用
+        print(f"❌ 模型列表请求失败（HTTP {response.status_code}）")
+        print()
+        print(f"响应内容: {response.text[:200]}")
+        print()
+        print("请检查：")
+        print(f"  1. 服务地址是否正确：{BASE_URL}")
+        print("  2. 是否触发了限流，稍后重试")
+        print("  3. 阿里云服务状态是否正常")
+        return False
+    
+    return True
+
+
+def test_api_key(full: bool = False):
+    """
+    测试 API 密钥配置
+    
+    默认只通过模型列表接口校验密钥；full 为 True（命令行传入 --full）时
+    再调用一次模型，验证完整的请求链路。
+    """
     print("=" * 60)
     print("DashScope API 连接测试")
     print("=" * 60)
@@ -43,6 +111,21 @@ def test_api_key():
     print(f"   长度: {len(api_key)} 字符")
     print()
     
+    # 预检：先用轻量请求校验密钥，无效时无需等待模型调用
+    print("正在校验 API 密钥...")
+    print()
+    
+    if not check_api_key(api_key):
+        return False
+    
+    print("✅ API 密钥验证通过")
+    print()
+    
+    if not full:
+        print("如需验证模型响应，请运行：")
+        print("   python test/test_connection.py --full")
+        return True
+    
     # 测试连接
     print("正在测试 DashScope 连接...")
     print()
@@ -54,8 +137,7 @@ def test_api_key():
         agent = Agent(
             model=DashScope(
                 id="qwen-plus",
-                # 中国大陆用户必须使用此端点
-                base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
+                base_url=BASE_URL
             ),
             markdown=True
         )
@@ -108,5 +190,5 @@ def test_api_key():
 
 
 if __name__ == "__main__":
-    success = test_api_key()
+    success = test_api_key(full="--full" in sys.argv[1:])
     exit(0 if success else 1)
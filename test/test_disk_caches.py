@@ -0,0 +1,240 @@
+"""
+磁盘缓存测试脚本 - 验证跨进程复用的缓存文件。
+
+此脚本测试：
+1. SkillLoader 的 frontmatter 磁盘缓存
+2. SkillCreatorTools 的 --help 输出磁盘缓存
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from agno_skills_agent import SkillLoader
+from agno_skills_agent.skill_creator_tools import SkillCreatorTools
+
+
+def _write_skill(skills_dir: Path, name: str, description: str) -> Path:
+    """写入只包含 frontmatter 和一行正文的 SKILL.md，返回其路径。"""
+    skill_dir = skills_dir / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    skill_md = skill_dir / "SKILL.md"
+    skill_md.write_text(f"---\nname: {name}\ndescription: {description}\n---\n正文\n", encoding="utf-8")
+    return skill_md
+
+
+def _rewrite_keeping_mtime(path: Path, text: str):
+    """改写文件内容，并恢复原来的 mtime，模拟 mtime 精度不足时的修改。"""
+    st = path.stat()
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _discover_from_cache(cache_path: Path, skills_dir: Path) -> dict:
+    """用新的 SkillLoader 发现 skills，返回 skill 名称 -> 是否由磁盘缓存命中。"""
+    loader = SkillLoader(cache_path=cache_path)
+    hits = set()
+    cached_frontmatter = loader._cached_frontmatter
+    
+    def tracking(skill_md_path):
+        parsed = cached_frontmatter(skill_md_path)
+        if parsed is not None:
+            hits.add(skill_md_path.parent.name)
+        return parsed
+    
+    loader._cached_frontmatter = tracking
+    skills = loader.discover_skills(skills_dir)
+    return {name: (metadata, name in hits) for name, metadata in skills.items()}
+
+
+def test_frontmatter_cache():
+    """测试 frontmatter 缓存的键、失效、清理和损坏文件的处理。"""
+    print("=" * 60)
+    print("TEST 1: Frontmatter disk cache")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        skills_dir = tmp / "skills"
+        cache_path = tmp / "cache" / "metadata.json"
+        alpha_md = _write_skill(skills_dir, "alpha", "first")
+        _write_skill(skills_dir, "beta", "second")
+        
+        # 相对路径发现时，缓存键仍是解析后的绝对路径，两种写法互相命中
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            result = _discover_from_cache(cache_path, Path("skills"))
+        finally:
+            os.chdir(cwd)
+        assert not any(hit for _, hit in result.values())
+        keys = {entry[0] for entry in json.loads(cache_path.read_text(encoding="utf-8"))}
+        assert keys == {str((skills_dir / name / "SKILL.md").resolve()) for name in ("alpha", "beta")}
+        
+        result = _discover_from_cache(cache_path, skills_dir.resolve())
+        assert all(hit for _, hit in result.values())
+        print("[OK] Keyed by resolved path, relative and absolute discovery share entries")
+        
+        # mtime 不变但大小改变：重新解析
+        _rewrite_keeping_mtime(alpha_md, "---\nname: alpha\ndescription: first, edited\n---\n正文\n")
+        result = _discover_from_cache(cache_path, skills_dir)
+        assert not result["alpha"][1]
+        assert result["alpha"][0].description == "first, edited"
+        assert result["beta"][1]
+        
+        # mtime 和大小都不变：由 frontmatter 摘要识别修改
+        _rewrite_keeping_mtime(alpha_md, "---\nname: alpha\ndescription: FIRST, EDITED\n---\n正文\n")
+        result = _discover_from_cache(cache_path, skills_dir)
+        assert not result["alpha"][1]
+        assert result["alpha"][0].description == "FIRST, EDITED"
+        print("[OK] Same-mtime edits detected by size and digest")
+        
+        # 删除的 skill 从缓存文件中移除
+        (skills_dir / "beta" / "SKILL.md").unlink()
+        (skills_dir / "beta").rmdir()
+        _discover_from_cache(cache_path, skills_dir)
+        keys = {entry[0] for entry in json.loads(cache_path.read_text(encoding="utf-8"))}
+        assert keys == {str(alpha_md.resolve())}
+        print("[OK] Entries for removed skills pruned")
+        
+        # 损坏、旧格式或字段类型不符的缓存文件被忽略，发现照常进行并重写为当前格式
+        st = alpha_md.stat()
+        stale = {"name": "alpha", "description": "stale"}
+        invalid_files = [
+            "{not json",
+            json.dumps({"a": 1}),
+            json.dumps([[str(alpha_md.resolve()), st.st_mtime_ns, 0, stale]]),
+            json.dumps([[str(alpha_md.resolve()), st.st_mtime_ns, st.st_size, "3", "digest", stale]]),
+        ]
+        for text in invalid_files:
+            cache_path.write_text(text, encoding="utf-8")
+            result = _discover_from_cache(cache_path, skills_dir)
+            assert result["alpha"][0].description == "FIRST, EDITED", text
+            assert not result["alpha"][1]
+            assert _discover_from_cache(cache_path, skills_dir)["alpha"][1]
+        print("[OK] Corrupt and old-format cache files ignored and rewritten")
+    
+    print("\n[OK] Frontmatter disk cache tests passed")
+    return True
+
+
+def _write_creator_scripts(examples_dir: Path, description: str) -> Path:
+    """在 examples_dir 下写入三个 skill-creator 脚本，返回 init_skill.py 的路径。"""
+    scripts_dir = examples_dir / "skills" / "skill-creator" / "scripts"
+    scripts_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("init_skill", "package_skill", "quick_validate"):
+        (scripts_dir / f"{name}.py").write_text(
+            "import argparse\n"
+            f"argparse.ArgumentParser(prog={name!r}, description={description!r}).parse_args()\n",
+            encoding="utf-8"
+        )
+    return scripts_dir / "init_skill.py"
+
+
+def _help_from_cache(cache_path: Path, examples_dir: Path) -> tuple:
+    """用新的 SkillCreatorTools 获取 init_skill.py 的帮助，返回 (帮助文本, 是否由磁盘缓存命中)。"""
+    creator = SkillCreatorTools(examples_dir, help_cache_path=cache_path)
+    runs = []
+    run_script = creator._run_script
+    
+    def tracking(*args, **kwargs):
+        runs.append(args)
+        return run_script(*args, **kwargs)
+    
+    creator._run_script = tracking
+    return creator.get_init_help(), not runs
+
+
+def test_help_cache():
+    """测试 --help 缓存的键、失效、清理和损坏文件的处理。"""
+    print("\n" + "=" * 60)
+    print("TEST 2: --help disk cache")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        examples_dir = tmp / "examples"
+        cache_path = tmp / "cache" / "help.json"
+        init_script = _write_creator_scripts(examples_dir, "v1")
+        
+        # 相对路径创建时，缓存键仍是脚本解析后的绝对路径
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            text, hit = _help_from_cache(cache_path, Path("examples"))
+        finally:
+            os.chdir(cwd)
+        assert "v1" in text and not hit
+        keys = [entry[0] for entry in json.loads(cache_path.read_text(encoding="utf-8"))]
+        assert keys == [str(init_script.resolve())]
+        
+        assert _help_from_cache(cache_path, examples_dir.resolve()) == (text, True)
+        print("[OK] Keyed by resolved path, relative and absolute paths share entries")
+        
+        # mtime 不变但大小改变：重新获取并替换旧条目
+        _rewrite_keeping_mtime(init_script, init_script.read_text(encoding="utf-8").replace("v1", "v2.0"))
+        text, hit = _help_from_cache(cache_path, examples_dir)
+        assert "v2.0" in text and not hit
+        assert len(json.loads(cache_path.read_text(encoding="utf-8"))) == 1
+        print("[OK] Same-mtime edit with a different size detected")
+        
+        # 已不存在的脚本的条目在加载时丢弃，下次写入时从文件中移除
+        gone = str(tmp / "gone.py")
+        entries = json.loads(cache_path.read_text(encoding="utf-8"))
+        cache_path.write_text(json.dumps(entries + [[gone, 1, 2, "old help"]]), encoding="utf-8")
+        creator = SkillCreatorTools(examples_dir, help_cache_path=cache_path)
+        assert gone not in creator._help_cache
+        creator.get_package_help()
+        keys = {entry[0] for entry in json.loads(cache_path.read_text(encoding="utf-8"))}
+        assert gone not in keys and str(init_script.resolve()) in keys
+        print("[OK] Entries for removed scripts pruned")
+        
+        # 损坏、旧格式或字段类型不符的缓存文件被忽略，并重写为当前格式
+        st = init_script.stat()
+        key = str(init_script.resolve())
+        invalid_files = [
+            "{not json",
+            json.dumps({"a": 1}),
+            json.dumps([[key, st.st_mtime_ns, "stale help"]]),
+            json.dumps([[key, st.st_mtime_ns, st.st_size, None]]),
+            json.dumps([[key, str(st.st_mtime_ns), st.st_size, "stale help"]]),
+        ]
+        for text in invalid_files:
+            cache_path.write_text(text, encoding="utf-8")
+            help_text, hit = _help_from_cache(cache_path, examples_dir)
+            assert "v2.0" in help_text and not hit, text
+            assert _help_from_cache(cache_path, examples_dir)[1]
+        print("[OK] Corrupt and old-format cache files ignored and rewritten")
+    
+    print("\n[OK] --help disk cache tests passed")
+    return True
+
+
+def main():
+    """运行所有测试。"""
+    tests = [
+        ("Frontmatter Disk Cache", test_frontmatter_cache),
+        ("Help Disk Cache", test_help_cache),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"\n[FAIL] Test '{test_name}' failed with exception: {e!r}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        status = "[OK] PASSED" if result else "[FAIL] FAILED"
+        print(f"{status}: {test_name}")
+    
+    return all(result for _, result in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,172 @@
+"""
+SkillExecutor 测试脚本 - 验证参考文件读取。
+
+此脚本测试：
+1. 参考文件的换行统一和 UTF-8 校验
+2. 参考文件文本缓存
+3. 按 argparse 定义生成的命令行参数构造函数
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from agno_skills_agent import SkillExecutor
+from agno_skills_agent import skill_executor
+
+
+def test_reference_decoding():
+    """测试参考文件按文本模式读取：CRLF 统一为 LF，无效 UTF-8 的文件报告错误。"""
+    print("=" * 60)
+    print("TEST 1: Reference decoding")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        references_dir = Path(tmp)
+        (references_dir / "a.md").write_bytes("第一行\r\n第二行\r第三行\n".encode("utf-8"))
+        (references_dir / "b.md").write_bytes(b"bad \xff byte\n")
+        
+        executor = SkillExecutor()
+        combined = executor.load_skill_references(references_dir, "demo")
+        
+        assert "第一行\n第二行\n第三行\n" in combined
+        assert "\r" not in combined
+        assert "�" not in combined
+        assert "## b.md\nError loading:" in combined
+        print("[OK] CRLF normalized, invalid UTF-8 reported per file")
+        
+        # ReferenceReader 使用同样的读取规则
+        reader = executor._create_reference_accessor(references_dir, "demo")
+        assert reader("a.md") == "第一行\n第二行\n第三行\n"
+        assert reader("b.md").startswith("Error reading reference:")
+        print("[OK] read_reference tool matches")
+    
+    print("\n[OK] Reference decoding tests passed")
+    return True
+
+
+def test_text_cache():
+    """测试文本缓存按路径保留单个条目、检测同 mtime 的修改，并按总字节数淘汰。"""
+    print("\n" + "=" * 60)
+    print("TEST 2: Text cache")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ref.md"
+        path.write_text("old", encoding="utf-8")
+        st = path.stat()
+        assert skill_executor._read_text_cached(str(path), st.st_mtime_ns, st.st_size) == "old"
+        
+        # 同一 mtime 下内容变长，大小不同即重新读取，并替换旧条目
+        path.write_text("newer", encoding="utf-8")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        st = path.stat()
+        assert skill_executor._read_text_cached(str(path), st.st_mtime_ns, st.st_size) == "newer"
+        assert skill_executor._TEXT_CACHE[str(path)][:2] == (st.st_mtime_ns, st.st_size)
+        print("[OK] One entry per path, same-mtime edit detected")
+        
+        # 总字节数超过上限时淘汰最久未使用的文件
+        max_bytes = skill_executor._TEXT_CACHE_MAX_BYTES
+        skill_executor._TEXT_CACHE_MAX_BYTES = 8
+        try:
+            paths = [Path(tmp) / f"{i}.md" for i in range(3)]
+            for p in paths:
+                p.write_text("x" * 4, encoding="utf-8")
+                st = p.stat()
+                skill_executor._read_text_cached(str(p), st.st_mtime_ns, st.st_size)
+            assert list(skill_executor._TEXT_CACHE) == [str(paths[1]), str(paths[2])]
+            assert skill_executor._TEXT_CACHE_BYTES == 8
+        finally:
+            skill_executor._TEXT_CACHE_MAX_BYTES = max_bytes
+        print("[OK] Cache bounded by total bytes")
+    
+    print("\n[OK] Text cache tests passed")
+    return True
+
+
+def _write_script(directory: str, name: str, body: str) -> Path:
+    """在 directory 中写入一个只包含 argparse 定义的脚本。"""
+    path = Path(directory) / name
+    path.write_text("import argparse\nparser = argparse.ArgumentParser()\n" + body, encoding="utf-8")
+    return path
+
+
+def test_argv_builder():
+    """测试参数构造函数的选项映射、store_true 开关、无法特化的定义和调用不匹配时的回退。"""
+    print("\n" + "=" * 60)
+    print("TEST 3: Argv builder")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        script = _write_script(tmp, "convert.py", (
+            'parser.add_argument("input")\n'
+            'parser.add_argument("-o", "--output-file")\n'
+            'parser.add_argument("--fmt", dest="format")\n'
+            'parser.add_argument("-n", "--dry-run", action="store_true")\n'
+        ))
+        build = skill_executor._compile_argv_builder(str(script))
+        assert build is not None
+        
+        # 选项使用 -- 形式的选项字符串，dest 由选项名或 dest= 决定
+        assert build("a.pdf") == ["a.pdf"]
+        assert build("a.pdf", output_file="b.txt", format="md") == ["a.pdf", "--output-file=b.txt", "--fmt=md"]
+        assert build(3, dry_run=True) == ["3", "--dry-run"]
+        assert build("a.pdf", dry_run=False) == ["a.pdf"]
+        print("[OK] Option strings and store_true switches mapped")
+        
+        # 调用方式不匹配时，ScriptRunner 回退为通用构造
+        runner = skill_executor.ScriptRunner(script, "demo")
+        assert runner._argv(("a.pdf",), {"unknown": 1}) == ["a.pdf", "--unknown=1"]
+        assert runner._argv((), {}) == []
+        assert runner._argv(("a.pdf",), {"dry_run": True}) == ["a.pdf", "--dry-run"]
+        print("[OK] Mismatched calls fall back to the generic builder")
+        
+        # 无法安全生成源码或不支持的用法不做特化
+        unsupported = [
+            'parser.add_argument("files", nargs="+")\n',
+            'parser.add_argument("--tag", action="append")\n',
+            'parser.add_argument("--x", dest=1)\n',
+            'parser.add_argument("--class")\n',
+            'parser.add_argument("--cmd")\n',
+            'parser.add_argument("--str")\n',
+            'parser.add_argument("input-file")\n',
+            'parser.add_argument("--a", dest="x")\nparser.add_argument("--b", dest="x")\n',
+            'parser.add_argument(NAME)\n',
+        ]
+        for i, body in enumerate(unsupported):
+            path = _write_script(tmp, f"unsupported_{i}.py", body)
+            assert skill_executor._compile_argv_builder(str(path)) is None, body
+        print("[OK] Unsupported definitions use the generic builder")
+    
+    print("\n[OK] Argv builder tests passed")
+    return True
+
+
+def main():
+    """运行所有测试。"""
+    tests = [
+        ("Reference Decoding", test_reference_decoding),
+        ("Text Cache", test_text_cache),
+        ("Argv Builder", test_argv_builder),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"\n[FAIL] Test '{test_name}' failed with exception: {e!r}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        status = "[OK] PASSED" if result else "[FAIL] FAILED"
+        print(f"{status}: {test_name}")
+    
+    return all(result for _, result in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
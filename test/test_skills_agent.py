@@ -9,6 +9,10 @@ Skills Agent 测试脚本 - 验证核心功能。
 5. 渐进式披露
 """
 
+import os
+import functools
+import itertools
+from operator import itemgetter
 from pathlib import Path
 from agno_skills_agent import (
     SkillsAgent,
@@ -18,45 +22,73 @@ from agno_skills_agent import (
 )
 
 
+# 相对于仓库根目录定位示例 skills，测试不依赖当前工作目录；可用 SKILLS_DIR 环境变量覆盖
+SKILLS_DIR = Path(os.environ.get(
+    "SKILLS_DIR",
+    Path(__file__).resolve().parent.parent / "skills-examples" / "skills"
+))
+
+# 设置 SKILLS_TEST_VERBOSE=0 时只输出标题、结果和总结，跳过逐项的详细信息
+VERBOSE = os.environ.get("SKILLS_TEST_VERBOSE", "1") != "0"
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_skills():
+    """返回共享的 SkillLoader 和发现结果，整个测试运行只扫描一次 skills 目录。"""
+    loader = SkillLoader()
+    return loader, loader.discover_skills(SKILLS_DIR)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_agent():
+    """返回共享的 SkillsAgent，复用已发现的 skills，不再扫描一次目录。"""
+    loader, skills = _shared_skills()
+    return SkillsAgent(
+        skills_dir=SKILLS_DIR,
+        debug=False,
+        skill_loader=loader,
+        preloaded_skills=skills
+    )
+
+
 def test_skill_loader():
     """测试 SkillLoader 功能。"""
     print("=" * 60)
     print("TEST 1: SkillLoader")
     print("=" * 60)
     
-    loader = SkillLoader()
-    skills_dir = Path("skills-examples/skills")
-    
-    if not skills_dir.exists():
-        print(f"[FAIL] Skills directory not found: {skills_dir}")
+    if not SKILLS_DIR.is_dir():
+        print(f"[FAIL] Skills directory not found: {SKILLS_DIR}")
         return False
     
     # 发现 skills
-    print(f"\nDiscovering skills in {skills_dir}...")
-    skills = loader.discover_skills(skills_dir)
+    print(f"\nDiscovering skills in {SKILLS_DIR}...")
+    loader, skills = _shared_skills()
     
     print(f"[OK] Discovered {len(skills)} skills")
     
     # 测试元数据加载
     if skills:
-        skill_name = list(skills.keys())[0]
+        skill_name = next(iter(skills))
         metadata = skills[skill_name]
-        print(f"\nSample skill metadata:")
-        print(f"  Name: {metadata.name}")
-        print(f"  Description: {metadata.description[:80]}...")
-        print(f"  Path: {metadata.path}")
+        if VERBOSE:
+            print(f"\nSample skill metadata:")
+            print(f"  Name: {metadata.name}")
+            print(f"  Description: {metadata.description[:80]}...")
+            print(f"  Path: {metadata.path}")
         
         # 测试完整内容加载
         print(f"\nLoading full content for '{skill_name}'...")
         content = loader.load_full_skill(skill_name)
         print(f"[OK] Loaded {len(content.instructions)} characters of instructions")
         
-        if content.scripts_dir:
-            print(f"[OK] Has scripts directory: {content.scripts_dir}")
-        if content.references_dir:
-            print(f"[OK] Has references directory: {content.references_dir}")
-        if content.assets_dir:
-            print(f"[OK] Has assets directory: {content.assets_dir}")
+        if VERBOSE:
+            if content.scripts_dir:
+                print(f"[OK] Has scripts directory: {content.scripts_dir}")
+            if content.references_dir:
+                print(f"[OK] Has references directory: {content.references_dir}")
+            if content.assets_dir:
+                print(f"[OK] Has assets directory: {content.assets_dir}")
     
     print("\n[OK] SkillLoader tests passed")
     return True
@@ -68,9 +100,7 @@ def test_skill_matcher():
     print("TEST 2: SkillMatcher")
     print("=" * 60)
     
-    loader = SkillLoader()
-    skills_dir = Path("skills-examples/skills")
-    skills = loader.discover_skills(skills_dir)
+    _, skills = _shared_skills()
     
     matcher = SkillMatcher()
     
@@ -83,12 +113,13 @@ def test_skill_matcher():
     ]
     
     for query in test_queries:
-        print(f"\nQuery: '{query}'")
         matches = matcher.match_skills(query, skills, top_k=3)
-        if matches:
-            print(f"  Matches: {', '.join(matches)}")
-        else:
-            print(f"  No matches found")
+        if VERBOSE:
+            print(f"\nQuery: '{query}'")
+            if matches:
+                print(f"  Matches: {', '.join(matches)}")
+            else:
+                print(f"  No matches found")
     
     # 测试精确匹配
     exact = matcher.find_exact_skill("mcp-builder", skills)
@@ -105,19 +136,11 @@ def test_skill_executor():
     print("TEST 3: SkillExecutor")
     print("=" * 60)
     
-    loader = SkillLoader()
+    loader, skills = _shared_skills()
     executor = SkillExecutor()
     
-    skills_dir = Path("skills-examples/skills")
-    skills = loader.discover_skills(skills_dir)
-    
-    # 查找包含脚本的 skill
-    test_skill = None
-    for skill_name in skills.keys():
-        content = loader.load_full_skill(skill_name)
-        if content.scripts_dir and content.scripts_dir.exists():
-            test_skill = skill_name
-            break
+    # 查找包含脚本的 skill：scripts 目录在发现时已确定，无需加载完整内容
+    test_skill = next((name for name, metadata in skills.items() if metadata.scripts_dir), None)
     
     if test_skill:
         print(f"\nTesting with skill: {test_skill}")
@@ -127,8 +150,9 @@ def test_skill_executor():
         tools = executor.create_agno_tools(content)
         print(f"[OK] Created {len(tools)} tools from skill")
         
-        for tool in tools[:3]:  # 显示前 3 个
-            print(f"  - {tool.__name__}")
+        if VERBOSE:
+            for tool in tools[:3]:  # 显示前 3 个
+                print(f"  - {tool.__name__}")
     else:
         print("\nNo skills with scripts found for testing")
     
@@ -142,10 +166,8 @@ def test_skills_agent():
     print("TEST 4: SkillsAgent Integration")
     print("=" * 60)
     
-    skills_dir = Path("skills-examples/skills")
-    
-    if not skills_dir.exists():
-        print(f"[FAIL] Skills directory not found: {skills_dir}")
+    if not SKILLS_DIR.is_dir():
+        print(f"[FAIL] Skills directory not found: {SKILLS_DIR}")
         return False
     
     print("\nInitializing SkillsAgent...")
@@ -153,23 +175,20 @@ def test_skills_agent():
     try:
         # 注意：这需要设置 DASHSCOPE_API_KEY
         # 我们只测试初始化，不进行 API 调用
-        agent = SkillsAgent(
-            skills_dir=skills_dir,
-            debug=False
-        )
+        agent = _shared_agent()
         
         print(f"[OK] Agent initialized successfully")
         print(f"[OK] Discovered {len(agent.skills_metadata)} skills")
         
         # 测试 skill 列表
-        skill_names = list(agent.skills_metadata.keys())
-        print(f"\nAvailable skills (first 5):")
-        for name in skill_names[:5]:
-            print(f"  - {name}")
+        if VERBOSE:
+            print(f"\nAvailable skills (first 5):")
+            for name in itertools.islice(agent.skills_metadata, 5):
+                print(f"  - {name}")
         
         # 测试手动激活（不进行 API 调用）
-        if skill_names:
-            test_skill = skill_names[0]
+        if agent.skills_metadata:
+            test_skill = next(iter(agent.skills_metadata))
             print(f"\nTesting manual activation of '{test_skill}'...")
             result = agent.activate_skill(test_skill)
             
@@ -195,24 +214,18 @@ def test_progressive_disclosure():
     print("TEST 5: Progressive Disclosure")
     print("=" * 60)
     
-    loader = SkillLoader()
-    skills_dir = Path("skills-examples/skills")
-    
     print("\nStage 1: Loading metadata only...")
-    skills = loader.discover_skills(skills_dir)
+    loader, skills = _shared_skills()
     
-    # 估算元数据大小
-    metadata_size = 0
-    for metadata in skills.values():
-        # 粗略估算：名称 + 描述长度
-        metadata_size += len(metadata.name) + len(metadata.description)
+    # 估算元数据大小，粗略估算：名称 + 描述长度
+    metadata_size = sum(len(metadata.name) + len(metadata.description) for metadata in skills.values())
     
     print(f"[OK] Loaded metadata for {len(skills)} skills")
     print(f"  Estimated metadata size: ~{metadata_size} characters")
     print(f"  Average per skill: ~{metadata_size // len(skills) if skills else 0} characters")
     
     if skills:
-        test_skill = list(skills.keys())[0]
+        test_skill = next(iter(skills))
         
         print(f"\nStage 2: Loading full content for '{test_skill}'...")
         content = loader.load_full_skill(test_skill)
@@ -234,6 +247,11 @@ def main():
     print("AGNO SKILLS AGENT - TEST SUITE")
     print("=" * 60)
     
+    # 所有测试都依赖 skills 目录，缺失时直接结束，不再逐个运行注定失败的测试
+    if not SKILLS_DIR.is_dir():
+        print(f"\n[FAIL] Skills directory not found: {SKILLS_DIR}")
+        return False
+    
     tests = [
         ("Skill Loader", test_skill_loader),
         ("Skill Matcher", test_skill_matcher),
@@ -257,7 +275,7 @@ def main():
     print("TEST SUMMARY")
     print("=" * 60)
     
-    passed = sum(1 for _, result in results if result)
+    passed = sum(map(itemgetter(1), results))
     total = len(results)
     
     for test_name, result in results: